@@ -0,0 +1,164 @@
+# api/app/closures.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, date as _date, time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import reminders, waitlist
+from .models import Appointment, DayOverride, Service, WaitlistEntry
+from .notifications import send_sms
+from .core.config import settings
+
+# longest range one close request may cover (local days, inclusive)
+MAX_CLOSE_DAYS = 62
+
+
+@dataclass
+class ClosureNotice:
+    """Plain data for one cancellation message, safe to use after the session is closed."""
+    client_phone: str
+    service_name: str
+    start_utc: datetime
+    waitlist_until: _date | None
+
+
+@dataclass
+class ClosureResult:
+    days: list[_date]
+    cancelled: list[Appointment]
+    notices: list[ClosureNotice]
+    waitlisted: int
+    offers: list[waitlist.HoldOffer]  # holds the waitlisted clients got on the following days
+
+
+def _days(d_from: _date, d_to: _date) -> list[_date]:
+    return [d_from + timedelta(days=i) for i in range((d_to - d_from).days + 1)]
+
+
+async def close_days(db: AsyncSession, d_from: _date, d_to: _date, waitlist_days: int = 0) -> ClosureResult:
+    """
+    Mark local days [d_from, d_to] closed and cancel every upcoming confirmed appointment
+    on them with a single UPDATE ... RETURNING. Their unsent reminders are dropped, holds
+    on those days go back to waiting and, if `waitlist_days` > 0, each cancelled client is
+    put on the waitlist for the days right after the closure and offered what is already
+    free there. Caller commits.
+    """
+    tz = ZoneInfo(settings.TIMEZONE)
+    utc = ZoneInfo("UTC")
+    now = datetime.now(utc)
+    days = _days(d_from, d_to)
+    range_start = datetime.combine(d_from, time.min, tzinfo=tz).astimezone(utc)
+    range_end = datetime.combine(d_to + timedelta(days=1), time.min, tzinfo=tz).astimezone(utc)
+
+    # closed overrides: update the days that have one, insert the rest
+    await db.execute(
+        update(DayOverride)
+        .where(DayOverride.date >= d_from, DayOverride.date <= d_to)
+        .values(is_closed=True, start_time=None, end_time=None)
+        .execution_options(synchronize_session=False)
+    )
+    existing = set(
+        (await db.execute(select(DayOverride.date).where(DayOverride.date >= d_from, DayOverride.date <= d_to)))
+        .scalars().all()
+    )
+    db.add_all(DayOverride(date=d, is_closed=True) for d in days if d not in existing)
+
+    cancelled = list(
+        (
+            await db.execute(
+                update(Appointment)
+                .where(
+                    Appointment.status == "confirmed",
+                    Appointment.start_utc >= max(range_start, now),
+                    Appointment.start_utc < range_end,
+                )
+                .values(status="cancelled")
+                .returning(Appointment)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalars().all()
+    )
+    cancelled.sort(key=lambda a: a.start_utc)
+    await reminders.unschedule(db, (a.id for a in cancelled))
+
+    # holds on a closed day can no longer be claimed
+    await db.execute(
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.status == "held",
+            WaitlistEntry.hold_start_utc >= range_start,
+            WaitlistEntry.hold_start_utc < range_end,
+        )
+        .values(status="waiting", hold_start_utc=None, hold_end_utc=None, hold_expires_utc=None)
+        .execution_options(synchronize_session=False)
+    )
+
+    services = {
+        s.id: s
+        for s in (
+            await db.execute(select(Service).where(Service.id.in_({a.service_id for a in cancelled})))
+        ).scalars().all()
+    } if cancelled else {}
+
+    waitlist_until = d_to + timedelta(days=waitlist_days) if waitlist_days > 0 else None
+    if waitlist_until:
+        db.add_all(
+            WaitlistEntry(
+                service_id=a.service_id,
+                duration_min=services[a.service_id].duration_min,
+                client_name=a.client_name,
+                client_phone=a.client_phone,
+                date_from=d_to + timedelta(days=1),
+                date_to=waitlist_until,
+                status="waiting",
+                created_at=now,
+            )
+            for a in cancelled
+        )
+
+    offers: list[waitlist.HoldOffer] = []
+    if waitlist_until and cancelled:
+        await db.flush()
+        offers = await waitlist.offer_open_days(db, d_to + timedelta(days=1), waitlist_until)
+
+    notices = [
+        ClosureNotice(
+            a.client_phone,
+            services[a.service_id].name,
+            a.start_utc,
+            waitlist_until,
+        )
+        for a in cancelled
+    ]
+    return ClosureResult(days, cancelled, notices, len(cancelled) if waitlist_until else 0, offers)
+
+
+def _closure_message(n: ClosureNotice) -> str:
+    tz = ZoneInfo(settings.TIMEZONE)
+    local_dt = n.start_utc.astimezone(tz)
+    he = (
+        f"‏עדכון ✨ Shirel Beauty\n"
+        f"{n.service_name} — {local_dt.strftime('%d/%m/%Y בשעה %H:%M')}\n"
+        f"התור בוטל כי הסלון סגור ביום זה. מתנצלות על אי הנוחות."
+    )
+    en = (
+        f"Update ✨ Shirel Beauty\n"
+        f"{n.service_name} — {local_dt.strftime('%d/%m/%Y at %H:%M')}\n"
+        f"Your appointment is cancelled because the salon is closed that day. Sorry for the inconvenience."
+    )
+    if n.waitlist_until:
+        until = n.waitlist_until.strftime("%d/%m/%Y")
+        he += f"\nנרשמת לרשימת ההמתנה עד {until} — נעדכן כשיתפנה תור."
+        en += f"\nYou're on the waitlist until {until}; we'll message you when a slot opens."
+    return f"{he}\n\n{en}"
+
+
+async def notify_closures(notices: list[ClosureNotice], offers: list[waitlist.HoldOffer]) -> None:
+    """Cancellation messages first, then any hold the client was offered on the following days."""
+    for n in notices:
+        await send_sms(n.client_phone, _closure_message(n))
+    await waitlist.notify_holds(offers)
@@ -1,5 +1,6 @@
 # api/app/core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Literal
 from pydantic import AliasChoices, Field
 
 class Settings(BaseSettings):
@@ -7,17 +8,58 @@ class Settings(BaseSettings):
         default="postgresql+asyncpg://postgres:postgres@db:5432/postgres",
         validation_alias=AliasChoices("DATABASE_URL", "DB_URL", "DATABASE_DSN"),
     )
+    # Connection pool per engine (for SQLite the writer pool is capped at 2)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Embedded mode (DATABASE_URL=sqlite+aiosqlite:///...): how long a writer waits for the file lock
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 15.0
+
+    # Optional read replica for read-only endpoints (services, availability, listings)
+    DATABASE_READ_URL: str | None = None
+    # after a write, reads go to the primary for this long so clients see their own changes
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+    # signs the last-write stamp clients echo back; share it across workers (random per process if unset)
+    READ_AFTER_WRITE_SECRET: str | None = None
 
     TIMEZONE: str = "Asia/Jerusalem"
     LEAD_MINUTES: int = 30
     BUFFER_MINUTES: int = 20
-    REMINDER_HOUR: int = 19
+    AVAILABILITY_REFRESH_SECONDS: int = 60  # recompute watched days so slots passing the lead time drop off live views
     ENABLE_REMINDERS: bool = True
+    REMINDER_OFFSETS_MINUTES: list[int] = [24 * 60, 120]  # day before + two hours before
+    REMINDER_TICK_SECONDS: int = 30                       # how often the dispatcher pulls due reminders
+    REMINDER_BATCH_SIZE: int = 50                         # max reminders sent per tick
+    REMINDER_MAX_ATTEMPTS: int = 3
+
+    # How long a stored Idempotency-Key response is replayed for duplicate requests
+    IDEMPOTENCY_TTL_HOURS: int = 24
+
+    # Public endpoints: per-client token buckets + global in-flight cap (shed before a DB session is taken)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_AVAILABILITY_PER_MINUTE: int = 60
+    RATE_LIMIT_AVAILABILITY_BURST: int = 20
+    RATE_LIMIT_BOOKING_PER_MINUTE: int = 6
+    RATE_LIMIT_BOOKING_BURST: int = 3
+    PUBLIC_MAX_CONCURRENCY: int = 8      # keep below the DB pool size so admin traffic still gets a connection
+    TRUST_PROXY_HEADERS: bool = False    # take client IP from CF-Connecting-IP / X-Forwarded-For
+    TRUSTED_PROXY_HOPS: int = 1          # proxies in front of the API that append to X-Forwarded-For
+
+    # Waitlist: how long a freed slot is held for the matched client, and max sign-up range
+    WAITLIST_HOLD_MINUTES: int = 15
+    WAITLIST_MAX_DAYS: int = 60
+
+    # Live availability push (WebSocket /availability/ws)
+    AVAILABILITY_WS_MAX_SUBSCRIBERS: int = 2000
+    AVAILABILITY_WS_HEARTBEAT_SECONDS: int = 25
 
     TWILIO_ACCOUNT_SID: str | None = None
     TWILIO_AUTH_TOKEN: str | None = None
     TWILIO_FROM: str | None = None
 
+    # Message delivery: "twilio", "memory" (kept in process) or "file" (NDJSON sink at NOTIFY_FILE_PATH)
+    NOTIFY_TRANSPORT: Literal["twilio", "memory", "file"] = "twilio"
+    NOTIFY_FILE_PATH: str = "notifications.ndjson"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_prefix="",
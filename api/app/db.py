@@ -1,13 +1,215 @@
 # api/app/db.py
+import hashlib
+import hmac
+import math
+import secrets
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import Request
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.types import DateTime, TypeDecorator
 from .core.config import settings
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(settings.DATABASE_URL, future=True, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+class UTCDateTime(TypeDecorator):
+    """
+    DateTime(timezone=True) that always hands back aware UTC datetimes.
+    Postgres stores timestamptz natively; SQLite has no timezone support, so
+    values are stored as naive UTC there (which also keeps them text-sortable).
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            raise ValueError("naive datetime bound to a UTC column")
+        value = value.astimezone(ZoneInfo("UTC"))
+        return value.replace(tzinfo=None) if dialect.name == "sqlite" else value
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, datetime) and value.tzinfo is None:
+            return value.replace(tzinfo=ZoneInfo("UTC"))
+        return value
+
+class PrimarySession(Session):
+    """Sync session behind AsyncSessionLocal; its write commits open the read-your-writes window."""
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _make_engine(url: str, writer: bool):
+    if not _is_sqlite(url):
+        return create_async_engine(
+            url, future=True, echo=False,
+            pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+
+    # Embedded single-node mode: one SQLite file in WAL mode. WAL lets readers run
+    # alongside the single writer; writer transactions start with BEGIN IMMEDIATE so
+    # concurrent bookings queue on busy_timeout instead of failing on lock upgrade.
+    eng = create_async_engine(
+        url, future=True, echo=False,
+        # SQLite has one writer at a time; more writer connections would only wait on the lock
+        pool_size=settings.DB_POOL_SIZE if not writer else min(settings.DB_POOL_SIZE, 2),
+        max_overflow=0,
+        connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_SECONDS},
+    )
+
+    @event.listens_for(eng.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None  # we issue BEGIN ourselves (below)
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")  # durable across app crashes; fsync at checkpoints
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_SECONDS * 1000)}")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache per connection
+        cur.close()
+
+    # The writer pool (AsyncSessionLocal) is for sessions that are going to write; read-only
+    # work on current data goes through fresh_read_session(), i.e. the reader pool here.
+    @event.listens_for(eng.sync_engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
+
+    return eng
+
+engine = _make_engine(settings.DATABASE_URL, writer=True)
+AsyncSessionLocal = async_sessionmaker(
+    engine, expire_on_commit=False, class_=AsyncSession, sync_session_class=PrimarySession
+)
+
+# Optional read replica for read-only handlers; without DATABASE_READ_URL reads use the primary.
+# On SQLite, reads get their own pool on the same file: WAL readers never block the writer
+# and there is no replication lag.
+_embedded = _is_sqlite(settings.DATABASE_URL)
+if settings.DATABASE_READ_URL:
+    read_engine = _make_engine(settings.DATABASE_READ_URL, writer=False)
+elif _embedded:
+    read_engine = _make_engine(settings.DATABASE_URL, writer=False)
+else:
+    read_engine = engine
+AsyncReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+# Read-your-writes is tracked per client, not per process: a response whose request
+# committed a write carries its time (header + cookie), and the client's reads within
+# READ_AFTER_WRITE_SECONDS of it go to the primary, whichever worker serves them.
+_replica_can_lag = bool(settings.DATABASE_READ_URL)
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+_request_writes: ContextVar[Optional[dict]] = ContextVar("request_writes", default=None)
+_stamp_key = (settings.READ_AFTER_WRITE_SECRET or secrets.token_hex(32)).encode()
+# tolerated clock difference between workers when checking a stamp
+_STAMP_SKEW_SECONDS = 2.0
+
+def _sign(ts: str) -> str:
+    return hmac.new(_stamp_key, ts.encode(), hashlib.sha256).hexdigest()[:32]
+
+def _make_stamp(at: float) -> str:
+    ts = f"{at:.3f}"
+    return f"{ts}:{_sign(ts)}"
+
+@event.listens_for(PrimarySession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "after_commit")
+def _committed(session):
+    if session.info.pop("wrote", False):
+        marker = _request_writes.get()
+        if marker is not None:
+            marker["at"] = time.time()
+
+async def read_your_writes(request: Request, call_next):
+    """Middleware: stamp responses of requests that committed a write with the write time."""
+    if not _replica_can_lag:
+        return await call_next(request)
+    marker: dict = {}
+    token = _request_writes.set(marker)  # shared with the handler's context (same dict)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_writes.reset(token)
+    if "at" in marker:
+        stamp = _make_stamp(marker["at"])
+        response.headers[LAST_WRITE_HEADER] = stamp
+        response.set_cookie(
+            LAST_WRITE_COOKIE, stamp,
+            max_age=math.ceil(settings.READ_AFTER_WRITE_SECONDS) + 1, httponly=True, samesite="lax",
+        )
+    return response
+
+def _client_last_write(request: Optional[Request]) -> float:
+    """The client's last write time if it sent back a stamp we signed; 0 for missing, forged or future stamps."""
+    if request is None:
+        return 0.0
+    raw = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not raw or ":" not in raw:
+        return 0.0
+    ts, sig = raw.split(":", 1)
+    if not hmac.compare_digest(sig, _sign(ts)):
+        return 0.0
+    try:
+        at = float(ts)
+    except ValueError:
+        return 0.0
+    return at if at <= time.time() + _STAMP_SKEW_SECONDS else 0.0
+
+def read_session(request: Optional[Request] = None) -> AsyncSession:
+    """
+    A session for read-only work: the replica, unless the client behind `request`
+    committed a write in the last READ_AFTER_WRITE_SECONDS (it may not have
+    replicated yet), then the primary.
+    """
+    if read_engine is engine:
+        return AsyncSessionLocal()
+    if _replica_can_lag and time.time() - _client_last_write(request) < settings.READ_AFTER_WRITE_SECONDS:
+        return AsyncSessionLocal()
+    return AsyncReadSessionLocal()
+
+def fresh_read_session() -> AsyncSession:
+    """
+    A read-only session that sees every committed write: the read pool when it can't
+    lag (same SQLite file, or no replica), otherwise the primary. Keeps read-only work
+    off the SQLite writer pool, whose transactions take the write lock.
+    """
+    return AsyncSessionLocal() if _replica_can_lag else AsyncReadSessionLocal()
+
+async def get_read_db(request: Request):
+    async with read_session(request) as session:
+        yield session
+
+def _add_missing_columns(conn):
+    """
+    create_all only creates missing tables. Add nullable columns (and their indexes)
+    introduced since an existing table was created; the app backfills the values.
+    """
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        have = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name not in have and col.nullable:
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(conn.dialect)}"
+                ))
+        indexes = {i["name"] for i in insp.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
 
 async def init_models():
     # Import models so they register with Base.metadata before create_all
@@ -15,4 +217,4 @@ async def init_models():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
+        await conn.run_sync(_add_missing_columns)
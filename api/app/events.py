@@ -0,0 +1,152 @@
+# api/app/events.py
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date as _date
+from typing import Dict, Optional
+
+from .db import fresh_read_session
+from .slots import DayState, load_day, slots_for
+
+log = logging.getLogger(__name__)
+
+# per-subscriber backlog; a subscriber that falls further behind gets a fresh snapshot instead
+QUEUE_SIZE = 16
+
+
+@dataclass
+class _Topic:
+    """Subscribers of one (service_id, date) and the slots they were last sent."""
+    duration_min: int
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+    last: Optional[Dict[str, dict]] = None  # start_iso -> slot; None until first loaded
+    seq: int = 0  # load that produced `last`; older loads finishing late are ignored
+
+
+def _snapshot(slots: Dict[str, dict]) -> dict:
+    return {"type": "snapshot", "slots": list(slots.values())}
+
+
+class AvailabilityHub:
+    """
+    In-process fan-out of slot changes. Each changed day is recomputed once
+    (one DB session, one load_day) no matter how many sockets watch it, and
+    only the diff is pushed to each subscriber's queue.
+    """
+
+    def __init__(self):
+        self._topics: Dict[_date, Dict[int, _Topic]] = {}
+        self._pending: set[_date] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._seq = 0
+
+    def subscriber_count(self) -> int:
+        return sum(len(t.subscribers) for by_svc in self._topics.values() for t in by_svc.values())
+
+    def days(self) -> list[_date]:
+        return list(self._topics)
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    async def subscribe(self, service_id: int, d: _date, duration_min: int) -> asyncio.Queue:
+        """Register a subscriber; its queue starts with a snapshot of the current slots."""
+        # registered before any await, so a change committed meanwhile still schedules a refresh
+        topic = self._topics.setdefault(d, {}).setdefault(service_id, _Topic(duration_min))
+        q: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        topic.subscribers.add(q)
+
+        if topic.last is not None:
+            # later refreshes diff against topic.last, so this snapshot is what they build on
+            q.put_nowait(_snapshot(topic.last))
+            return q
+
+        seq = self._next_seq()
+        try:
+            async with fresh_read_session() as db:
+                state = await load_day(db, d)
+        except Exception:
+            self.unsubscribe(service_id, d, q)
+            raise
+        self._apply(d, seq, state)
+        return q
+
+    def unsubscribe(self, service_id: int, d: _date, q: asyncio.Queue) -> None:
+        by_svc = self._topics.get(d)
+        if not by_svc or service_id not in by_svc:
+            return
+        topic = by_svc[service_id]
+        topic.subscribers.discard(q)
+        if not topic.subscribers:
+            del by_svc[service_id]
+        if not by_svc:
+            del self._topics[d]
+
+    def day_changed(self, *days: _date) -> None:
+        """Schedule a recompute for each watched day (call after the change is committed)."""
+        for d in days:
+            if d not in self._topics or d in self._pending:
+                continue
+            self._pending.add(d)
+            task = asyncio.create_task(self._refresh(d))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, d: _date) -> None:
+        # changes arriving from here on schedule another refresh
+        self._pending.discard(d)
+        seq = self._next_seq()
+        try:
+            # runs right after the triggering write, which a lagging replica may not have yet
+            async with fresh_read_session() as db:
+                state = await load_day(db, d)
+        except Exception:
+            log.exception("Availability refresh failed for %s", d)
+            return
+        self._apply(d, seq, state)
+
+    def _apply(self, d: _date, seq: int, state: DayState) -> None:
+        """Push `state` (loaded as load number `seq`) to the day's subscribers as a snapshot or diff."""
+        for topic in list(self._topics.get(d, {}).values()):
+            if topic.seq > seq:
+                continue  # a load started later has already been applied
+            new = {s.start_iso: s.model_dump() for s in slots_for(state, topic.duration_min)}
+            if topic.last is None:
+                topic.last, topic.seq = new, seq
+                for q in list(topic.subscribers):
+                    q.put_nowait(_snapshot(new))
+                continue
+
+            added = [slot for k, slot in new.items() if k not in topic.last]
+            removed = [k for k in topic.last if k not in new]
+            topic.last, topic.seq = new, seq
+            if not added and not removed:
+                continue
+
+            diff = {"type": "diff", "added": added, "removed": removed}
+            for q in list(topic.subscribers):
+                try:
+                    q.put_nowait(diff)
+                except asyncio.QueueFull:
+                    # too far behind for diffs to be useful: replace the backlog with a snapshot
+                    while not q.empty():
+                        q.get_nowait()
+                    q.put_nowait(_snapshot(new))
+
+
+availability_hub = AvailabilityHub()
+
+
+def publish_day_changed(*days: _date) -> None:
+    availability_hub.day_changed(*days)
+
+
+async def refresh_watched_days() -> None:
+    """
+    Periodic recompute of every watched day, for changes no write announces:
+    slots falling inside the lead time and writes made by other processes.
+    """
+    availability_hub.day_changed(*availability_hub.days())
@@ -0,0 +1,143 @@
+# api/app/harness.py
+"""
+Reminder throughput harness: replays a synthetic reminder day through a
+notification transport, without a database or a Twilio account.
+
+    python -m app.harness --appointments 20000 --transport memory
+    python -m app.harness --transport file --file /tmp/reminders.ndjson --min-rate 5000
+    python -m app.harness --transport twilio-dry-run --appointments 500
+
+The synthetic phones look real, so nothing here can reach Twilio:
+twilio-dry-run is TwilioTransport over a recording client (same number
+formatting and threading, no network).
+
+Each message goes through the same path as a real reminder (template,
+phone normalization, transport). Exits non-zero if throughput falls below
+--min-rate, so it can guard against regressions.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from datetime import datetime, date as _date, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+from .core.config import settings
+from .notifications import send_sms
+from .reminders import reminder_body
+from .transport import FileTransport, MemoryTransport, Transport, TwilioTransport
+
+SERVICE_NAMES = ["Eyelashes", "Eyebrows", "Combo"]
+
+
+class _RecordedMessages:
+    """Stands in for twilio Client.messages: keeps the create() calls, sends nothing."""
+
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    def create(self, from_: str, to: str, body: str):
+        self.calls.append({"from_": from_, "to": to, "body": body})
+        return SimpleNamespace(sid=f"DRY{len(self.calls):08d}")
+
+
+def twilio_dry_run() -> TwilioTransport:
+    """TwilioTransport with a recording client in place of the real one (credentials are never used)."""
+    transport = TwilioTransport(None, None, settings.TWILIO_FROM or "whatsapp:+10000000000")
+    transport._client = SimpleNamespace(messages=_RecordedMessages())
+    transport.name = "twilio-dry-run"
+    return transport
+
+
+def synthetic_day(n: int, day: _date, seed: int = 0) -> list[tuple[str, str, datetime]]:
+    """`n` (phone, service name, local start) tuples spread over 08:00–22:00, phones in mixed input formats."""
+    rnd = random.Random(seed)
+    tz = ZoneInfo(settings.TIMEZONE)
+    open_ = datetime.combine(day, dtime(8, 0), tzinfo=tz)
+    formats = ["+9725{}", "whatsapp:+9725{}", "05{}"]
+    out = []
+    for _ in range(n):
+        digits = f"{rnd.randrange(10**8):08d}"
+        phone = rnd.choice(formats).format(digits)
+        start = open_ + timedelta(minutes=30 * rnd.randrange(28))
+        out.append((phone, rnd.choice(SERVICE_NAMES), start))
+    return out
+
+
+async def replay(transport: Transport, day: list[tuple[str, str, datetime]], concurrency: int) -> dict:
+    latencies: list[float] = []
+    failures = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(phone: str, svc_name: str, start: datetime):
+        nonlocal failures
+        async with sem:
+            t0 = time.perf_counter()
+            ok = await send_sms(phone, reminder_body(svc_name, start), transport=transport)
+            latencies.append(time.perf_counter() - t0)
+            if not ok:
+                failures += 1
+
+    t0 = time.perf_counter()
+    if concurrency == 1:
+        # same shape as the dispatcher: one message after another
+        for item in day:
+            await one(*item)
+    else:
+        await asyncio.gather(*(one(*item) for item in day))
+    elapsed = time.perf_counter() - t0
+    await transport.close()
+
+    latencies.sort()
+    return {
+        "transport": transport.name,
+        "messages": len(day),
+        "failures": failures,
+        "seconds": elapsed,
+        "rate": len(day) / elapsed if elapsed > 0 else float("inf"),
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--appointments", type=int, default=10_000, help="reminders in the synthetic day")
+    ap.add_argument("--transport", choices=["memory", "file", "twilio-dry-run"], default="memory")
+    ap.add_argument("--file", default=None, help="NDJSON path for --transport file (default NOTIFY_FILE_PATH)")
+    ap.add_argument("--concurrency", type=int, default=1, help="in-flight sends (dispatcher uses 1)")
+    ap.add_argument("--min-rate", type=float, default=0.0, help="fail if messages/second is below this")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.transport == "memory":
+        transport: Transport = MemoryTransport()
+    elif args.transport == "file":
+        transport = FileTransport(args.file or settings.NOTIFY_FILE_PATH)
+    else:
+        transport = twilio_dry_run()
+
+    tomorrow = datetime.now(ZoneInfo(settings.TIMEZONE)).date() + timedelta(days=1)
+    day = synthetic_day(args.appointments, tomorrow, args.seed)
+    r = asyncio.run(replay(transport, day, max(1, args.concurrency)))
+
+    print(
+        f"{r['transport']}: {r['messages']} messages in {r['seconds']:.3f}s "
+        f"-> {r['rate']:.0f} msg/s (p50 {r['p50_ms']:.3f} ms, p99 {r['p99_ms']:.3f} ms), "
+        f"{r['failures']} failed"
+    )
+    if r["failures"]:
+        return 1
+    if args.min_rate and r["rate"] < args.min_rate:
+        print(f"below --min-rate {args.min_rate:.0f} msg/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# api/app/idempotency.py
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, fresh_read_session
+from .models import IdempotencyRecord
+from .core.config import settings
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def fingerprint(method: str, path: str, payload: BaseModel) -> str:
+    """Hash of the request, so a key can't be reused for a different request."""
+    raw = json.dumps(
+        {"method": method, "path": path, "body": payload.model_dump(mode="json")},
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def replay(db: AsyncSession, key: Optional[str], fp: str) -> Optional[JSONResponse]:
+    """
+    Return the stored response for `key`, or None if the key is new (or expired).
+    Raises 422 if the key was already used with a different request.
+    """
+    if not key:
+        return None
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+    # looked up outside `db`: on SQLite its first statement would take the write lock
+    async with fresh_read_session() as rdb:
+        rec = (
+            await rdb.execute(select(IdempotencyRecord).where(IdempotencyRecord.key == key))
+        ).scalar_one_or_none()
+    if not rec:
+        return None
+
+    cutoff = datetime.now(ZoneInfo("UTC")) - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    if rec.created_at < cutoff:
+        # expired: forget it so this request can store a fresh response under the same key
+        await db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id == rec.id))
+        return None
+
+    if rec.fingerprint != fp:
+        raise HTTPException(422, "Idempotency-Key was already used with a different request")
+
+    return JSONResponse(
+        status_code=rec.status_code,
+        content=json.loads(rec.response_body),
+        headers={REPLAY_HEADER: "true"},
+    )
+
+
+async def commit(
+    db: AsyncSession,
+    key: Optional[str],
+    fp: str,
+    status_code: int,
+    body: BaseModel,
+) -> Optional[JSONResponse]:
+    """
+    Commit the pending changes together with the response stored under `key`.
+    If a concurrent request with the same key committed first, roll back and
+    return that request's response instead (None means: respond normally).
+    """
+    if key:
+        db.add(
+            IdempotencyRecord(
+                key=key,
+                fingerprint=fp,
+                status_code=status_code,
+                response_body=body.model_dump_json(),
+                created_at=datetime.now(ZoneInfo("UTC")),
+            )
+        )
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        replayed = await replay(db, key, fp)
+        if replayed is None:
+            raise
+        return replayed
+    return None
+
+
+async def purge_expired() -> int:
+    """Delete records older than IDEMPOTENCY_TTL_HOURS (scheduler job; keys are random per action, so most never come back)."""
+    cutoff = datetime.now(ZoneInfo("UTC")) - timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    async with fresh_read_session() as rdb:
+        expired = (
+            await rdb.execute(select(IdempotencyRecord.id).where(IdempotencyRecord.created_at < cutoff).limit(1))
+        ).first()
+    if not expired:
+        return 0
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.created_at < cutoff))
+        await db.commit()
+    return res.rowcount or 0
@@ -1,18 +1,26 @@
 from fastapi import FastAPI
-from sqlalchemy import select
-from .db import init_models, AsyncSessionLocal
-from .models import Service
+from sqlalchemy import select, update
+from .db import init_models, AsyncSessionLocal, read_your_writes, LAST_WRITE_HEADER
+from .models import Service, Appointment, UNPARSABLE_PHONE
 from .routers import services as services_router
 from .routers import availability as availability_router
 from .routers import appointments as appointments_router
 from .routers import overrides as overrides_router
+from .routers import waitlist as waitlist_router
+from .routers import admin as admin_router
 from fastapi.middleware.cors import CORSMiddleware
 from .scheduler import start_scheduler
 from .routers import dev as dev_router
-from .core.config import settings
+from .ratelimit import admission_control
+from .transport import normalize_phone
 
 app = FastAPI(title="Shirel Beauty API", version="0.1.0")
 
+# Rate limiting / load shedding for public endpoints (registered before CORS so 429/503 still get CORS headers)
+app.middleware("http")(admission_control)
+# Per-client read-your-writes window for the read replica (see db.read_session)
+app.middleware("http")(read_your_writes)
+
 # ✅ Add CORS immediately after app creation
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
 @app.on_event("startup")
@@ -35,8 +44,26 @@ async def startup():
                 Service(name="Combo",     duration_min=210, price=300, active=True),
             ])
             await db.commit()
-    if settings.ENABLE_REMINDERS:
-    	start_scheduler()
+        # normalized phones for appointments booked before the column existed
+        rows = (
+            await db.execute(
+                select(Appointment.id, Appointment.client_phone).where(Appointment.client_phone_e164.is_(None))
+            )
+        ).all()
+        fixed = []
+        for appt_id, phone in rows:
+            try:
+                e164 = normalize_phone(phone)
+            except ValueError:
+                e164 = UNPARSABLE_PHONE  # marked once instead of rescanned on every boot
+            if len(e164) > 16:
+                e164 = UNPARSABLE_PHONE  # longer than E.164 allows; would not fit the column
+            fixed.append({"id": appt_id, "client_phone_e164": e164})
+        if fixed:
+            await db.execute(update(Appointment), fixed)
+            await db.commit()
+    # waitlist hold expiry runs regardless; reminder jobs only when ENABLE_REMINDERS is on
+    start_scheduler()
 
 @app.get("/health")
 def health():
@@ -46,4 +73,6 @@ app.include_router(services_router.router)
 app.include_router(availability_router.router)
 app.include_router(appointments_router.router)
 app.include_router(overrides_router.router)
+app.include_router(waitlist_router.router)
+app.include_router(admin_router.router)
 app.include_router(dev_router.router)
@@ -1,6 +1,6 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, Boolean, Date, Time, DateTime, ForeignKey, Column, Integer
-from .db import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, String, Boolean, Date, Time, DateTime, ForeignKey, Column, Integer, Text, Index
+from .db import Base, UTCDateTime
 
 class Service(Base):
     __tablename__ = "services"
@@ -18,16 +18,26 @@ class DailyOverride(Base):
     end_time: Mapped[Time] = mapped_column(Time)
     is_closed: Mapped[bool] = mapped_column(Boolean, default=False)
 
+# client_phone_e164 of legacy rows whose phone normalize_phone rejects, so the startup backfill skips them
+UNPARSABLE_PHONE = "invalid"
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    # "my appointments" looks clients up by normalized phone, newest/oldest by start
+    __table_args__ = (Index("ix_appointments_phone_start", "client_phone_e164", "start_utc"),)
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     service_id: Mapped[int] = mapped_column(ForeignKey("services.id"))
     client_name: Mapped[str] = mapped_column(String(120))
-    client_phone: Mapped[str] = mapped_column(String(40))
-    start_utc: Mapped[DateTime] = mapped_column(DateTime(timezone=True), index=True)
-    end_utc: Mapped[DateTime] = mapped_column(DateTime(timezone=True), index=True)
+    client_phone: Mapped[str] = mapped_column(String(40))  # as submitted
+    client_phone_e164: Mapped[str] = mapped_column(String(16), nullable=True)  # transport.normalize_phone(client_phone)
+    start_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), index=True)
+    end_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), index=True)
     status: Mapped[str] = mapped_column(String(20), default="confirmed")
 
+    # load explicitly with joinedload(Appointment.service); lazy loads can't run under asyncio
+    service: Mapped["Service"] = relationship(lazy="raise")
+
 class DayOverride(Base):
     __tablename__ = "day_overrides"
 
@@ -36,3 +46,47 @@ class DayOverride(Base):
     is_closed = Column(Boolean, nullable=False, default=False)
     start_time = Column(Time, nullable=True)  # local time (HH:MM)
     end_time = Column(Time, nullable=True)
+
+class IdempotencyRecord(Base):
+    """Stored response for a client-supplied Idempotency-Key (short-lived)."""
+    __tablename__ = "idempotency_records"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    key: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    fingerprint: Mapped[str] = mapped_column(String(64))  # sha256 of method + path + body
+    status_code: Mapped[int] = mapped_column(Integer)
+    response_body: Mapped[str] = mapped_column(Text)      # JSON
+    created_at: Mapped[DateTime] = mapped_column(UTCDateTime(), index=True)
+
+class WaitlistEntry(Base):
+    """A client waiting for an opening of a service between date_from and date_to (local days)."""
+    __tablename__ = "waitlist_entries"
+    # matching looks up waiting entries by day, then by the length of the freed gap
+    __table_args__ = (Index("ix_waitlist_match", "status", "date_from", "date_to", "duration_min"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    service_id: Mapped[int] = mapped_column(ForeignKey("services.id"))
+    duration_min: Mapped[int] = mapped_column(Integer)  # copied from the service at sign-up
+    client_name: Mapped[str] = mapped_column(String(120))
+    client_phone: Mapped[str] = mapped_column(String(40))
+    date_from: Mapped[Date] = mapped_column(Date)
+    date_to: Mapped[Date] = mapped_column(Date)
+    status: Mapped[str] = mapped_column(String(20), default="waiting")  # waiting | held | booked | expired | cancelled
+    created_at: Mapped[DateTime] = mapped_column(UTCDateTime())
+    hold_start_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), nullable=True)
+    hold_end_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), nullable=True)
+    hold_expires_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), nullable=True)
+
+class Reminder(Base):
+    """One scheduled reminder message for an appointment (one row per offset)."""
+    __tablename__ = "reminders"
+    # the dispatcher only ever reads pending rows that are due
+    __table_args__ = (Index("ix_reminders_due", "status", "send_at_utc"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    appointment_id: Mapped[int] = mapped_column(ForeignKey("appointments.id", ondelete="CASCADE"), index=True)
+    offset_min: Mapped[int] = mapped_column(Integer)  # minutes before the appointment start
+    send_at_utc: Mapped[DateTime] = mapped_column(UTCDateTime())
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending | sending | sent | failed | skipped
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    sent_at_utc: Mapped[DateTime] = mapped_column(UTCDateTime(), nullable=True)
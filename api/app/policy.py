@@ -0,0 +1,17 @@
+# api/app/policy.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Cancelling less than this many hours before the start costs PENALTY_RATE of the price
+CANCEL_NOTICE_HOURS = 24
+PENALTY_RATE = 0.5
+
+
+def cancellation_penalty(price: int, start_utc: datetime, now: Optional[datetime] = None) -> int:
+    """Penalty (shekels) for cancelling an appointment that starts at `start_utc`, as of `now`."""
+    now = now or datetime.now(ZoneInfo("UTC"))
+    hours_left = (start_utc - now).total_seconds() / 3600
+    return int(price * PENALTY_RATE) if hours_left < CANCEL_NOTICE_HOURS else 0
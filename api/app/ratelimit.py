@@ -0,0 +1,122 @@
+# api/app/ratelimit.py
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from .core.config import settings
+
+
+class TokenBucketLimiter:
+    """In-process token buckets, one per client. Refill is computed lazily on each hit."""
+
+    def __init__(self, per_minute: int, burst: int, max_clients: int = 10_000):
+        self.rate = per_minute / 60.0  # tokens per second
+        self.burst = float(max(burst, 1))
+        self.max_clients = max_clients
+        # client -> [tokens, last_update], least recently seen first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def hit(self, client: str) -> float:
+        """Take one token for `client`. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._evict_idle(now)
+            bucket = self._buckets[client] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(client)
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1.0 - bucket[0]) / self.rate
+
+    def _evict_idle(self, now: float) -> None:
+        # a bucket that would be full again carries no state worth keeping; buckets are
+        # ordered by last hit, so the idle ones are all at the front
+        refill_time = self.burst / self.rate if self.rate > 0 else math.inf
+        while self._buckets and now - next(iter(self._buckets.values()))[1] >= refill_time:
+            self._buckets.popitem(last=False)
+        if len(self._buckets) >= self.max_clients:
+            # still full: forget only the least recently seen client, never everyone
+            self._buckets.popitem(last=False)
+
+
+# (method, path) -> limiter, for the public unauthenticated endpoints
+_limiters: Dict[tuple[str, str], TokenBucketLimiter] = {
+    ("GET", "/availability"): TokenBucketLimiter(
+        settings.RATE_LIMIT_AVAILABILITY_PER_MINUTE, settings.RATE_LIMIT_AVAILABILITY_BURST
+    ),
+    ("POST", "/appointments"): TokenBucketLimiter(
+        settings.RATE_LIMIT_BOOKING_PER_MINUTE, settings.RATE_LIMIT_BOOKING_BURST
+    ),
+    ("GET", "/appointments/by-phone"): TokenBucketLimiter(
+        settings.RATE_LIMIT_AVAILABILITY_PER_MINUTE, settings.RATE_LIMIT_AVAILABILITY_BURST
+    ),
+    ("POST", "/waitlist"): TokenBucketLimiter(
+        settings.RATE_LIMIT_BOOKING_PER_MINUTE, settings.RATE_LIMIT_BOOKING_BURST
+    ),
+}
+
+_in_flight = 0
+
+
+def client_ip(request: Request) -> str:
+    if settings.TRUST_PROXY_HEADERS:
+        ip = request.headers.get("cf-connecting-ip")
+        if ip:
+            return ip.strip()
+        fwd = request.headers.get("x-forwarded-for")
+        if fwd:
+            # only the last TRUSTED_PROXY_HOPS entries were added by our proxies; anything
+            # left of them comes from the client and can be forged
+            hops = [h.strip() for h in fwd.split(",") if h.strip()]
+            n = max(1, settings.TRUSTED_PROXY_HOPS)
+            if len(hops) >= n:
+                return hops[-n]
+    return request.client.host if request.client else "unknown"
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def admission_control(request: Request, call_next):
+    """
+    HTTP middleware for the public endpoints: 429 when a client exceeds its bucket,
+    503 when too many public requests are already in flight. Both happen before
+    the route's get_db dependency runs, so rejected requests never touch the pool.
+    """
+    global _in_flight
+
+    limiter: Optional[TokenBucketLimiter] = _limiters.get((request.method, request.url.path.rstrip("/")))
+    if limiter is None or not settings.RATE_LIMIT_ENABLED:
+        return await call_next(request)
+
+    wait = limiter.hit(client_ip(request))
+    if wait > 0:
+        return _reject(429, "Too many requests, please slow down.", wait)
+
+    if _in_flight >= settings.PUBLIC_MAX_CONCURRENCY:
+        return _reject(503, "Server is busy, please retry shortly.", 1)
+
+    _in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        _in_flight -= 1
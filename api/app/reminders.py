@@ -0,0 +1,178 @@
+# api/app/reminders.py
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, delete, exists, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, fresh_read_session
+from .models import Appointment, Reminder, Service
+from .notifications import send_sms
+from .transport import get_transport
+from .core.config import settings
+
+log = logging.getLogger(__name__)
+
+
+def reminder_body(svc_name: str, local_dt: datetime) -> str:
+    when_he = local_dt.strftime("%d/%m/%Y בשעה %H:%M")
+    when_en = local_dt.strftime("%d/%m/%Y at %H:%M")
+    return (
+        f"‏תזכורת ✨ Shirel Beauty\n"
+        f"{svc_name} — {when_he}\n"
+        f"מדיניות ביטול: פחות מ־24 שעות → תשלום 50%.\n\n"
+        f"Reminder ✨ Shirel Beauty\n"
+        f"{svc_name} — {when_en}\n"
+        f"Cancellation policy: <24h → 50% fee."
+    )
+
+
+# ---------------------------
+# Queue maintenance (called inside the booking transaction)
+# ---------------------------
+def schedule(db: AsyncSession, appt: Appointment) -> None:
+    """Queue one reminder per REMINDER_OFFSETS_MINUTES that is still in the future. `appt` must have an id."""
+    now = datetime.now(ZoneInfo("UTC"))
+    for offset in sorted(set(settings.REMINDER_OFFSETS_MINUTES), reverse=True):
+        send_at = appt.start_utc - timedelta(minutes=offset)
+        if send_at > now:
+            db.add(Reminder(appointment_id=appt.id, offset_min=offset, send_at_utc=send_at, status="pending", attempts=0))
+
+
+async def unschedule(db: AsyncSession, appointment_ids: Iterable[int]) -> None:
+    """Drop unsent reminders of cancelled/rescheduled appointments (sent ones are kept as history)."""
+    ids = list(appointment_ids)
+    if ids:
+        await db.execute(
+            delete(Reminder).where(Reminder.appointment_id.in_(ids), Reminder.status.in_(("pending", "sending")))
+        )
+
+
+async def reschedule(db: AsyncSession, appt: Appointment) -> None:
+    await unschedule(db, [appt.id])
+    schedule(db, appt)
+
+
+async def backfill() -> int:
+    """Queue reminders for upcoming confirmed appointments that have none (e.g. booked before the queue existed)."""
+    now = datetime.now(ZoneInfo("UTC"))
+    async with AsyncSessionLocal() as db:
+        appts = (
+            await db.execute(
+                select(Appointment).where(
+                    Appointment.status == "confirmed",
+                    Appointment.start_utc > now,
+                    ~exists().where(Reminder.appointment_id == Appointment.id),
+                )
+            )
+        ).scalars().all()
+        for ap in appts:
+            schedule(db, ap)
+        await db.commit()
+    if appts:
+        print(f"[REMINDER] Backfilled reminders for {len(appts)} appointment(s)")
+    return len(appts)
+
+
+# ---------------------------
+# Dispatcher (one tick of the wheel)
+# ---------------------------
+# a claimed reminder whose send didn't finish (worker died) is retried after this
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+async def dispatch_due() -> int:
+    """
+    Send reminders whose time has come, oldest first, at most REMINDER_BATCH_SIZE per tick.
+    Due rows are claimed in one short transaction and settled in another; no transaction
+    (or SQLite write lock) is held while the transport talks to the network.
+    """
+    tz = ZoneInfo(settings.TIMEZONE)
+    now = datetime.now(ZoneInfo("UTC"))
+
+    # most ticks find nothing due; check without taking the writer's lock
+    async with fresh_read_session() as rdb:
+        any_due = (
+            await rdb.execute(
+                select(Reminder.id)
+                .where(Reminder.status.in_(("pending", "sending")), Reminder.send_at_utc <= now)
+                .limit(1)
+            )
+        ).first()
+    if not any_due:
+        return 0
+
+    # no transport to send through (e.g. Twilio without credentials): a dry run, not failures
+    if not get_transport().configured:
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                update(Reminder)
+                .where(Reminder.status.in_(("pending", "sending")), Reminder.send_at_utc <= now)
+                .values(status="skipped")
+            )
+            await db.commit()
+        log.info("Transport not configured; skipped %s due reminder(s)", res.rowcount)
+        return 0
+
+    # 1) claim
+    batch: list[tuple[int, str, str]] = []  # (reminder id, phone, body)
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(Reminder, Appointment, Service.name)
+                .join(Appointment, Appointment.id == Reminder.appointment_id)
+                .outerjoin(Service, Service.id == Appointment.service_id)
+                .where(Reminder.status.in_(("pending", "sending")), Reminder.send_at_utc <= now)
+                .order_by(Reminder.send_at_utc)
+                .limit(settings.REMINDER_BATCH_SIZE)
+                # several API workers may tick at once; each reminder goes to exactly one
+                .with_for_update(skip_locked=True, of=Reminder)
+            )
+        ).all()
+
+        for rem, ap, svc_name in rows:
+            if ap.status != "confirmed" or ap.start_utc <= now:
+                rem.status = "skipped"
+                continue
+            rem.status = "sending"
+            rem.attempts += 1
+            rem.send_at_utc = now + CLAIM_LEASE
+            body = reminder_body(svc_name or "שירות / Service", ap.start_utc.astimezone(tz))
+            batch.append((rem.id, ap.client_phone, body))
+        await db.commit()
+
+    if not batch:
+        return 0
+
+    # 2) send
+    ok_ids: set[int] = set()
+    for rem_id, phone, body in batch:
+        if await send_sms(phone, body):
+            ok_ids.add(rem_id)
+
+    # 3) settle
+    done = datetime.now(ZoneInfo("UTC"))
+    async with AsyncSessionLocal() as db:
+        claimed = (
+            await db.execute(select(Reminder).where(Reminder.id.in_([b[0] for b in batch])))
+        ).scalars().all()
+        for rem in claimed:
+            if rem.status != "sending":
+                continue  # e.g. appointment cancelled meanwhile
+            if rem.id in ok_ids:
+                rem.status = "sent"
+                rem.sent_at_utc = done
+            elif rem.attempts >= settings.REMINDER_MAX_ATTEMPTS:
+                rem.status = "failed"
+                log.warning("Reminder #%s for appt #%s failed after %s attempts", rem.id, rem.appointment_id, rem.attempts)
+            else:
+                # back off before the next try
+                rem.status = "pending"
+                rem.send_at_utc = done + timedelta(minutes=5 * rem.attempts)
+        await db.commit()
+
+    return len(ok_ids)
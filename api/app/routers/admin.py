@@ -0,0 +1,77 @@
+# api/app/routers/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from datetime import datetime, date as Date, time
+from zoneinfo import ZoneInfo
+
+from ..db import get_read_db
+from ..models import Appointment
+from ..policy import cancellation_penalty
+from ..schemas import AdminAppointmentOut, AdminDayOut, AdminDayTotals
+from ..core.config import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# ---------- DAY VIEW ----------
+@router.get("/day", response_model=AdminDayOut)
+async def admin_day(
+    date: str = Query(..., description="YYYY-MM-DD (local day)"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Appointments of one local day joined with their service, plus day totals, in one query."""
+    tz = ZoneInfo(settings.TIMEZONE)
+    utc = ZoneInfo("UTC")
+
+    try:
+        d = Date.fromisoformat(date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format (YYYY-MM-DD)")
+    start_local = datetime.combine(d, time.min, tzinfo=tz)
+    end_local   = datetime.combine(d, time.max, tzinfo=tz)
+
+    rows = (
+        await db.execute(
+            select(Appointment)
+            .options(joinedload(Appointment.service))
+            .where(
+                Appointment.start_utc >= start_local.astimezone(utc),
+                Appointment.start_utc <  end_local.astimezone(utc),
+            )
+            .order_by(Appointment.start_utc)
+        )
+    ).scalars().all()
+
+    now = datetime.now(utc)
+    items: list[AdminAppointmentOut] = []
+    for ap in rows:
+        price = ap.service.price if ap.service else 0
+        items.append(
+            AdminAppointmentOut(
+                id=ap.id,
+                service_id=ap.service_id,
+                client_name=ap.client_name,
+                client_phone=ap.client_phone,
+                start_utc=ap.start_utc,
+                end_utc=ap.end_utc,
+                status=ap.status,
+                service_name=ap.service.name if ap.service else None,
+                service_price=price,
+                penalty_if_cancelled_now=(
+                    cancellation_penalty(price, ap.start_utc, now) if ap.status == "confirmed" else 0
+                ),
+            )
+        )
+
+    confirmed = [a for a in items if a.status == "confirmed"]
+    return AdminDayOut(
+        date=d.isoformat(),
+        appointments=items,
+        totals=AdminDayTotals(
+            confirmed=len(confirmed),
+            cancelled=len(items) - len(confirmed),
+            revenue=sum(a.service_price for a in confirmed),
+            penalties_if_cancelled=sum(a.penalty_if_cancelled_now for a in confirmed),
+        ),
+    )
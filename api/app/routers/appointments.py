@@ -1,14 +1,23 @@
 # api/app/routers/appointments.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, delete, func
+from sqlalchemy.orm import joinedload
 from datetime import datetime, date as Date, time, timedelta
 from zoneinfo import ZoneInfo
 
-from ..db import AsyncSessionLocal
-from ..models import Service, DailyOverride, Appointment
-from ..schemas import AppointmentCreate, AppointmentOut, AppointmentUpdate, AppointmentActionResponse
+from .. import idempotency, reminders, waitlist
+from ..db import AsyncSessionLocal, get_read_db
+from ..events import availability_hub, publish_day_changed
+from ..models import Service, Appointment
+from ..schemas import (
+    AppointmentCreate, AppointmentOut, AppointmentUpdate, AppointmentActionResponse,
+    ClientAppointmentOut, ClientAppointmentsOut,
+)
 from ..core.config import settings
+from ..policy import cancellation_penalty
+from ..slots import working_window
+from ..transport import normalize_phone
 
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
@@ -22,7 +31,7 @@ async def list_appointments(
     date: str | None = Query(
         None, description="Optional YYYY-MM-DD (local day to filter)"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     tz = ZoneInfo(settings.TIMEZONE)
     utc = ZoneInfo("UTC")
@@ -45,12 +54,62 @@ async def list_appointments(
     rows = (await db.execute(q)).scalars().all()
     return rows
 
+# ---------- CLIENT LOOKUP ("my appointments") ----------
+@router.get("/by-phone", response_model=ClientAppointmentsOut)
+async def appointments_by_phone(
+    phone: str = Query(..., description="Client phone: +9725XXXXXXXX, 05XXXXXXXX or whatsapp:+9725XXXXXXXX"),
+    past_limit: int = Query(20, ge=0, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """A client's upcoming and recent appointments, served by the (client_phone_e164, start_utc) index."""
+    try:
+        e164 = normalize_phone(phone)
+    except ValueError:
+        raise HTTPException(400, "Invalid phone number")
+
+    now = datetime.now(ZoneInfo("UTC"))
+    q = (
+        select(Appointment)
+        .options(joinedload(Appointment.service))
+        .where(Appointment.client_phone_e164 == e164)
+    )
+    upcoming = (
+        await db.execute(q.where(Appointment.start_utc >= now).order_by(Appointment.start_utc))
+    ).scalars().all()
+    past = (
+        await db.execute(
+            q.where(Appointment.start_utc < now).order_by(Appointment.start_utc.desc()).limit(past_limit)
+        )
+    ).scalars().all()
+
+    def out(ap: Appointment) -> ClientAppointmentOut:
+        return ClientAppointmentOut(
+            **AppointmentOut.model_validate(ap).model_dump(),
+            service_name=ap.service.name if ap.service else None,
+        )
+
+    return ClientAppointmentsOut(
+        phone=e164,
+        upcoming=[out(ap) for ap in upcoming],
+        past=[out(ap) for ap in past],
+    )
+
 # ---------- CREATE APPOINTMENT ----------
 @router.post("", response_model=AppointmentOut, status_code=status.HTTP_201_CREATED)
-async def create_appointment(payload: AppointmentCreate, db: AsyncSession = Depends(get_db)):
+async def create_appointment(
+    payload: AppointmentCreate,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_db),
+):
     tz = ZoneInfo(settings.TIMEZONE)
     utc = ZoneInfo("UTC")
 
+    # retried request: replay the stored response without re-running the checks
+    fp = idempotency.fingerprint("POST", "/appointments", payload)
+    replayed = await idempotency.replay(db, idempotency_key, fp)
+    if replayed:
+        return replayed
+
     # service exists & active
     svc = (
         await db.execute(
@@ -75,16 +134,11 @@ async def create_appointment(payload: AppointmentCreate, db: AsyncSession = Depe
     if start_local < (datetime.now(tz) + timedelta(minutes=settings.LEAD_MINUTES)):
         raise HTTPException(400, f"Must book at least {settings.LEAD_MINUTES} minutes in advance")
 
-    # working hours (override or default)
-    ov = (
-        await db.execute(select(DailyOverride).where(DailyOverride.date == start_local.date()))
-    ).scalar_one_or_none()
-    if ov and ov.is_closed:
+    # working hours (same DayOverride rules as /availability)
+    window = await working_window(db, start_local.date())
+    if window is None:
         raise HTTPException(400, "Day is closed")
-    start_t = ov.start_time if ov else time(8, 0)
-    end_t   = ov.end_time   if ov else time(22, 0)
-    window_start = datetime.combine(start_local.date(), start_t, tzinfo=tz)
-    window_end   = datetime.combine(start_local.date(), end_t, tzinfo=tz)
+    window_start, window_end = window
     if not (window_start <= start_local and end_local <= window_end):
         raise HTTPException(400, "Outside working hours")
 
@@ -105,18 +159,29 @@ async def create_appointment(payload: AppointmentCreate, db: AsyncSession = Depe
     conflicts = (await db.execute(conflict_q)).scalar_one()
     if conflicts:
         raise HTTPException(409, "This time is already booked. Please pick another slot.")
+    # slots offered to waitlisted clients are only bookable through /waitlist/{id}/claim
+    if await waitlist.overlaps_hold(db, start_utc, end_utc):
+        raise HTTPException(409, "This time is held for another client. Please pick another slot.")
 
     # create
     appt = Appointment(
         service_id=svc.id,
         client_name=payload.client_name.strip(),
         client_phone=payload.client_phone.strip(),
+        client_phone_e164=normalize_phone(payload.client_phone),
         start_utc=start_utc,
         end_utc=end_utc,
         status="confirmed",
     )
     db.add(appt)
-    await db.commit()
+    await db.flush()  # assigns appt.id for the stored response and the reminders
+    reminders.schedule(db, appt)
+    replayed = await idempotency.commit(
+        db, idempotency_key, fp, status.HTTP_201_CREATED, AppointmentOut.model_validate(appt)
+    )
+    if replayed:
+        return replayed
+    publish_day_changed(start_local.date())
     await db.refresh(appt)
     return appt
 
@@ -147,18 +212,31 @@ async def delete_appointments(
     else:
         await db.execute(delete(Appointment))
     await db.commit()
+    publish_day_changed(*([d] if date else availability_hub.days()))
 
 # ---------- CANCEL / RESCHEDULE ----------
 @router.patch("/{appt_id}", response_model=AppointmentActionResponse)
 async def update_appointment(
     appt_id: int,
     payload: AppointmentUpdate,
+    background_tasks: BackgroundTasks,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: AsyncSession = Depends(get_db),
 ):
     tz = ZoneInfo(settings.TIMEZONE)
     utc = ZoneInfo("UTC")
 
-    appt = (await db.execute(select(Appointment).where(Appointment.id == appt_id))).scalar_one_or_none()
+    fp = idempotency.fingerprint("PATCH", f"/appointments/{appt_id}", payload)
+    replayed = await idempotency.replay(db, idempotency_key, fp)
+    if replayed:
+        return replayed
+
+    # service comes along in the same query (price for the penalty, duration for reschedule)
+    appt = (
+        await db.execute(
+            select(Appointment).options(joinedload(Appointment.service)).where(Appointment.id == appt_id)
+        )
+    ).scalar_one_or_none()
     if not appt:
         raise HTTPException(404, "Appointment not found")
 
@@ -169,14 +247,23 @@ async def update_appointment(
 
         # 24h policy
         start_local = appt.start_utc.astimezone(tz)
-        hours_left = (start_local - datetime.now(tz)).total_seconds() / 3600
-        # Find price for penalty
-        svc = (await db.execute(select(Service).where(Service.id == appt.service_id))).scalar_one_or_none()
-        price = svc.price if svc else 0
-        penalty = int(price * 0.5) if hours_left < 24 else 0
+        price = appt.service.price if appt.service else 0
+        penalty = cancellation_penalty(price, appt.start_utc)
 
         appt.status = "cancelled"
+        await reminders.unschedule(db, [appt.id])
+        resp = AppointmentActionResponse(appointment=AppointmentOut.model_validate(appt), penalty_due=penalty)
+        replayed = await idempotency.commit(db, idempotency_key, fp, status.HTTP_200_OK, resp)
+        if replayed:
+            return replayed
+
+        # offer the freed time (incl. its buffer) to the waitlist
+        BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+        offers = await waitlist.offer_freed(db, appt.start_utc, appt.end_utc + BUFFER)
         await db.commit()
+        background_tasks.add_task(waitlist.notify_holds, offers)
+        publish_day_changed(start_local.date())
+
         await db.refresh(appt)
         return AppointmentActionResponse(appointment=appt, penalty_due=penalty)
 
@@ -184,7 +271,7 @@ async def update_appointment(
     if payload.action == "reschedule":
         if not payload.new_start_iso:
             raise HTTPException(400, "new_start_iso is required to reschedule")
-        svc = (await db.execute(select(Service).where(Service.id == appt.service_id))).scalar_one_or_none()
+        svc = appt.service
         if not svc or not svc.active:
             raise HTTPException(404, "Service not found")
 
@@ -203,14 +290,11 @@ async def update_appointment(
         if new_start_local < (datetime.now(tz) + timedelta(minutes=settings.LEAD_MINUTES)):
             raise HTTPException(400, f"Must reschedule with at least {settings.LEAD_MINUTES} minutes in advance")
 
-        # working hours (override or default)
-        ov = (await db.execute(select(DailyOverride).where(DailyOverride.date == new_start_local.date()))).scalar_one_or_none()
-        if ov and ov.is_closed:
+        # working hours (same DayOverride rules as /availability)
+        window = await working_window(db, new_start_local.date())
+        if window is None:
             raise HTTPException(400, "Day is closed")
-        start_t = ov.start_time if ov else time(8, 0)
-        end_t   = ov.end_time   if ov else time(22, 0)
-        window_start = datetime.combine(new_start_local.date(), start_t, tzinfo=tz)
-        window_end   = datetime.combine(new_start_local.date(), end_t, tzinfo=tz)
+        window_start, window_end = window
         if not (window_start <= new_start_local and new_end_local <= window_end):
             raise HTTPException(400, "Outside working hours")
 
@@ -232,11 +316,24 @@ async def update_appointment(
         conflicts = (await db.execute(conflict_q)).scalar_one()
         if conflicts:
             raise HTTPException(409, "This time is already booked. Please pick another slot.")
+        if await waitlist.overlaps_hold(db, new_s_utc, new_e_utc):
+            raise HTTPException(409, "This time is held for another client. Please pick another slot.")
 
         # apply change
+        old_s_utc, old_e_utc = appt.start_utc, appt.end_utc
         appt.start_utc = new_s_utc
         appt.end_utc   = new_e_utc
+        await reminders.reschedule(db, appt)
+        resp = AppointmentActionResponse(appointment=AppointmentOut.model_validate(appt))
+        replayed = await idempotency.commit(db, idempotency_key, fp, status.HTTP_200_OK, resp)
+        if replayed:
+            return replayed
+
+        offers = await waitlist.offer_freed(db, old_s_utc, old_e_utc + BUFFER)
         await db.commit()
+        background_tasks.add_task(waitlist.notify_holds, offers)
+        publish_day_changed(old_s_utc.astimezone(tz).date(), new_start_local.date())
+
         await db.refresh(appt)
         return AppointmentActionResponse(appointment=appt)
 
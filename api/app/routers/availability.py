@@ -1,35 +1,27 @@
 # api/app/routers/availability.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import datetime, date as _date, time as dtime, timedelta
-from zoneinfo import ZoneInfo
+from datetime import date as _date
 
-from ..db import AsyncSessionLocal
-from ..models import Appointment, Service, DayOverride
-from ..schemas import AvailabilityResponse, AvailabilitySlot
+from ..db import get_read_db, read_session
+from ..events import availability_hub
+from ..models import Service
+from ..schemas import AvailabilityResponse
+from ..slots import compute_slots
 from ..core.config import settings
 
 router = APIRouter(prefix="/availability", tags=["availability"])
 
-# 30-minute slot steps
-SLOT_STEP_MIN = 30
-
-
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
-
 
 @router.get("", response_model=AvailabilityResponse)
 async def availability(
     service_id: int = Query(..., ge=1),
     date: str = Query(..., description="YYYY-MM-DD"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    tz = ZoneInfo(settings.TIMEZONE)
-    utc = ZoneInfo("UTC")
-
     # 1) Validate service
     svc = (
         await db.execute(
@@ -45,80 +37,64 @@ async def availability(
     except ValueError:
         raise HTTPException(400, "Invalid date format (expected YYYY-MM-DD)")
 
-    # 3) Working hours (default 08:00–22:00, overridden by DayOverride)
-    open_start = dtime(8, 0)
-    open_end = dtime(22, 0)
-
-    res = await db.execute(select(DayOverride).where(DayOverride.date == d))
-    ov = res.scalar_one_or_none()
-    if ov:
-        if ov.is_closed:
-            return AvailabilityResponse(slots=[])  # whole day closed
-        if ov.start_time:
-            open_start = ov.start_time
-        if ov.end_time:
-            open_end = ov.end_time
+    # 3) Working hours (default 08:00–22:00, overridden by DayOverride), lead time,
+    #    existing appointments (+ buffer after) and waitlist holds -> free slots
+    return AvailabilityResponse(slots=await compute_slots(db, svc.duration_min, d))
 
-    # If override produced an invalid window, return empty
-    if open_end <= open_start:
-        return AvailabilityResponse(slots=[])
 
-    day_start = datetime.combine(d, open_start, tzinfo=tz)
-    day_end = datetime.combine(d, open_end, tzinfo=tz)
-
-    # 4) Lead time (e.g., 30 min) in local tz
-    lead_cutoff = datetime.now(tz) + timedelta(minutes=settings.LEAD_MINUTES)
+@router.websocket("/ws")
+async def availability_ws(
+    websocket: WebSocket,
+    service_id: int = Query(..., ge=1),
+    date: str = Query(..., description="YYYY-MM-DD"),
+):
+    """
+    Live slots for (service_id, date): a {"type": "snapshot"} message first, then
+    {"type": "diff", "added": [...], "removed": [start_iso, ...]} whenever a booking,
+    cancellation, hold or override changes that day. {"type": "ping"} keeps idle
+    connections open. No DB session is held while the socket is idle.
+    """
+    try:
+        d = _date.fromisoformat(date)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid date format")
+        return
 
-    # 5) Fetch existing appointments intersecting this local day
-    day_start_utc = day_start.astimezone(utc)
-    day_end_utc = day_end.astimezone(utc)
-    existing = (
-        await db.execute(
-            select(Appointment)
-            .where(
-                Appointment.status == "confirmed",
-                Appointment.start_utc < day_end_utc,
-                Appointment.end_utc > day_start_utc,
+    async with read_session() as db:
+        svc = (
+            await db.execute(
+                select(Service).where(Service.id == service_id, Service.active == True)
             )
-            .order_by(Appointment.start_utc)
-        )
-    ).scalars().all()
-
-    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
-    step = timedelta(minutes=SLOT_STEP_MIN)
-    duration = timedelta(minutes=svc.duration_min)
-
-    # 6) Build candidate slots
-    slots: list[AvailabilitySlot] = []
-    cursor = day_start
-    while cursor + duration <= day_end:
-        start_local = cursor
-        end_local = cursor + duration
-
-        # Honor lead time
-        if start_local >= lead_cutoff:
-            s_u = start_local.astimezone(utc)
-            e_u = end_local.astimezone(utc)
-
-            # Overlap rule with buffer AFTER existing appt
-            conflict = False
-            for ap in existing:
-                blocked_start = ap.start_utc
-                blocked_end = ap.end_utc + BUFFER  # buffer AFTER existing appt
-                # conflict if windows overlap
-                if not (e_u <= blocked_start or s_u >= blocked_end):
-                    conflict = True
-                    break
-
-            if not conflict:
-                slots.append(
-                    AvailabilitySlot(
-                        start_iso=start_local.isoformat(),
-                        end_iso=end_local.isoformat(),
-                        label=start_local.strftime("%H:%M"),
-                    )
-                )
-
-        cursor += step
-
-    return AvailabilityResponse(slots=slots)
+        ).scalar_one_or_none()
+    if not svc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Service not found")
+        return
+    if availability_hub.subscriber_count() >= settings.AVAILABILITY_WS_MAX_SUBSCRIBERS:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many subscribers")
+        return
+
+    await websocket.accept()
+    q = await availability_hub.subscribe(svc.id, d, svc.duration_min)
+
+    async def pump():
+        while True:
+            try:
+                msg = await asyncio.wait_for(q.get(), timeout=settings.AVAILABILITY_WS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                msg = {"type": "ping"}
+            await websocket.send_json(msg)
+
+    async def drain():
+        # we don't expect client messages; reading is how a close is noticed
+        while True:
+            msg = await websocket.receive()
+            if msg["type"] == "websocket.disconnect":
+                return
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(drain())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        availability_hub.unsubscribe(svc.id, d, q)
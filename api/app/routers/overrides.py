@@ -1,12 +1,17 @@
 # api/app/routers/overrides.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from datetime import date, timedelta, time as dtime
+from zoneinfo import ZoneInfo
 
-from ..db import AsyncSessionLocal
+from .. import closures, waitlist
+from ..db import AsyncSessionLocal, get_read_db
+from ..events import publish_day_changed
 from ..models import DayOverride
-from ..schemas import OverrideOut, OverrideUpsert
+from ..slots import working_window
+from ..schemas import AppointmentOut, OverrideOut, OverrideUpsert, CloseDaysRequest, CloseDaysOut
+from ..core.config import settings
 
 router = APIRouter(prefix="/overrides", tags=["overrides"])
 
@@ -37,7 +42,7 @@ def parse_hhmm(s: str) -> dtime:
 @router.get("", response_model=list[OverrideOut])
 async def list_overrides(
     month: str = Query(..., description="YYYY-MM"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     start, end = parse_month(month)
     res = await db.execute(
@@ -54,10 +59,49 @@ async def list_overrides(
         for r in rows
     ]
 
+def _after_close(result: closures.ClosureResult, background_tasks: BackgroundTasks) -> None:
+    """Notify clients in one batch and push the closed days (and any new holds) to subscribers."""
+    background_tasks.add_task(closures.notify_closures, result.notices, result.offers)
+    tz = ZoneInfo(settings.TIMEZONE)
+    publish_day_changed(*result.days, *{o.start_utc.astimezone(tz).date() for o in result.offers})
+
+def check_waitlist_days(n: int) -> None:
+    if n > settings.WAITLIST_MAX_DAYS:
+        raise HTTPException(400, f"waitlist_days can be at most {settings.WAITLIST_MAX_DAYS}")
+
+@router.post("/close", response_model=CloseDaysOut)
+async def close_days(
+    body: CloseDaysRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """Close a day or range and cancel its upcoming appointments in one go (clients are notified in one batch)."""
+    try:
+        d_from = date.fromisoformat(body.date_from)
+        d_to = date.fromisoformat(body.date_to) if body.date_to else d_from
+    except Exception:
+        raise HTTPException(400, "dates must be 'YYYY-MM-DD'")
+    if d_to < d_from:
+        raise HTTPException(400, "date_to must be on or after date_from")
+    if (d_to - d_from).days >= closures.MAX_CLOSE_DAYS:
+        raise HTTPException(400, f"Can close at most {closures.MAX_CLOSE_DAYS} days at once")
+    check_waitlist_days(body.waitlist_days)
+
+    result = await closures.close_days(db, d_from, d_to, body.waitlist_days)
+    out = CloseDaysOut(
+        days=[d.isoformat() for d in result.days],
+        cancelled=[AppointmentOut.model_validate(a) for a in result.cancelled],
+        waitlisted=result.waitlisted,
+    )
+    await db.commit()
+    _after_close(result, background_tasks)
+    return out
+
 @router.put("/{date_str}", response_model=OverrideOut)
 async def upsert_override(
     date_str: str,
     body: OverrideUpsert,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -65,26 +109,40 @@ async def upsert_override(
     except Exception:
         raise HTTPException(400, "date must be 'YYYY-MM-DD'")
 
-    st = et = None
-    if not body.is_closed:
-        if not body.start_time or not body.end_time:
-            raise HTTPException(400, "start_time and end_time required when not closed")
-        st = parse_hhmm(body.start_time)
-        et = parse_hhmm(body.end_time)
-        if et <= st:
-            raise HTTPException(400, "end_time must be after start_time")
+    # closing a day also cancels what is booked on it, exactly like POST /overrides/close
+    if body.is_closed:
+        check_waitlist_days(body.waitlist_days)
+        result = await closures.close_days(db, d, d, body.waitlist_days)
+        await db.commit()
+        _after_close(result, background_tasks)
+        return OverrideOut(date=d.isoformat(), is_closed=True, start_time=None, end_time=None)
 
+    if not body.start_time or not body.end_time:
+        raise HTTPException(400, "start_time and end_time required when not closed")
+    st = parse_hhmm(body.start_time)
+    et = parse_hhmm(body.end_time)
+    if et <= st:
+        raise HTTPException(400, "end_time must be after start_time")
+
+    old_window = await working_window(db, d)
     res = await db.execute(select(DayOverride).where(DayOverride.date == d))
     row = res.scalar_one_or_none()
     if row:
-        row.is_closed = body.is_closed
+        row.is_closed = False
         row.start_time = st
         row.end_time = et
     else:
-        row = DayOverride(date=d, is_closed=body.is_closed, start_time=st, end_time=et)
+        row = DayOverride(date=d, is_closed=False, start_time=st, end_time=et)
         db.add(row)
 
     await db.commit()
+
+    # hours added to the day go to the waitlist first
+    offers = await waitlist.offer_widened_hours(db, d, old_window, await working_window(db, d))
+    await db.commit()
+    background_tasks.add_task(waitlist.notify_holds, offers)
+    publish_day_changed(d)
+
     await db.refresh(row)
     return OverrideOut(
         date=row.date.isoformat(),
@@ -94,13 +152,19 @@ async def upsert_override(
     )
 
 @router.delete("/{date_str}", status_code=204)
-async def delete_override(date_str: str, db: AsyncSession = Depends(get_db)):
+async def delete_override(date_str: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     try:
         d = date.fromisoformat(date_str)
     except Exception:
         raise HTTPException(400, "date must be 'YYYY-MM-DD'")
+    old_window = await working_window(db, d)
     res = await db.execute(select(DayOverride).where(DayOverride.date == d))
     row = res.scalar_one_or_none()
     if row:
         await db.delete(row)
         await db.commit()
+
+        offers = await waitlist.offer_widened_hours(db, d, old_window, await working_window(db, d))
+        await db.commit()
+        background_tasks.add_task(waitlist.notify_holds, offers)
+        publish_day_changed(d)
@@ -0,0 +1,152 @@
+# api/app/routers/waitlist.py
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from datetime import datetime, date as Date, timedelta
+from zoneinfo import ZoneInfo
+
+from .. import reminders, waitlist
+from ..db import AsyncSessionLocal, get_read_db
+from ..events import publish_day_changed
+from ..models import Service, Appointment, WaitlistEntry
+from ..slots import working_window
+from ..schemas import WaitlistCreate, WaitlistOut, WaitlistClaim, AppointmentOut
+from ..core.config import settings
+from ..transport import normalize_phone
+
+router = APIRouter(prefix="/waitlist", tags=["waitlist"])
+
+async def get_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def parse_day(s: str, field: str) -> Date:
+    try:
+        return Date.fromisoformat(s)
+    except ValueError:
+        raise HTTPException(400, f"{field} must be 'YYYY-MM-DD'")
+
+# ---------- JOIN ----------
+@router.post("", response_model=WaitlistOut, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(payload: WaitlistCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+    tz = ZoneInfo(settings.TIMEZONE)
+
+    svc = (
+        await db.execute(
+            select(Service).where(Service.id == payload.service_id, Service.active == True)
+        )
+    ).scalar_one_or_none()
+    if not svc:
+        raise HTTPException(404, "Service not found")
+
+    d_from = parse_day(payload.date_from, "date_from")
+    d_to = parse_day(payload.date_to, "date_to")
+    today = datetime.now(tz).date()
+    if d_to < d_from:
+        raise HTTPException(400, "date_to must be on or after date_from")
+    if d_to < today:
+        raise HTTPException(400, "Date range is in the past")
+    if (d_to - max(d_from, today)).days >= settings.WAITLIST_MAX_DAYS:
+        raise HTTPException(400, f"Date range can span at most {settings.WAITLIST_MAX_DAYS} days")
+
+    entry = WaitlistEntry(
+        service_id=svc.id,
+        duration_min=svc.duration_min,
+        client_name=payload.client_name,
+        client_phone=payload.client_phone,
+        date_from=max(d_from, today),
+        date_to=d_to,
+        status="waiting",
+        created_at=datetime.now(ZoneInfo("UTC")),
+    )
+    db.add(entry)
+    await db.commit()
+    await db.refresh(entry)
+
+    # time that is already free is offered after the response, not inside this public request
+    background_tasks.add_task(waitlist.match_new_entry, entry.id)
+    return entry
+
+# ---------- LIST (admin) ----------
+@router.get("", response_model=list[WaitlistOut])
+async def list_waitlist(
+    date: str | None = Query(None, description="Optional YYYY-MM-DD: entries covering that local day"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    q = (
+        select(WaitlistEntry)
+        .where(WaitlistEntry.status.in_(("waiting", "held")))
+        .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+    )
+    if date:
+        d = parse_day(date, "date")
+        q = q.where(WaitlistEntry.date_from <= d, WaitlistEntry.date_to >= d)
+    return (await db.execute(q)).scalars().all()
+
+# ---------- LEAVE ----------
+@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_waitlist(entry_id: int, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+    entry = (await db.execute(select(WaitlistEntry).where(WaitlistEntry.id == entry_id))).scalar_one_or_none()
+    if not entry:
+        raise HTTPException(404, "Waitlist entry not found")
+    if entry.status not in ("waiting", "held"):
+        return
+    was_held = entry.status == "held"
+    entry.status = "cancelled"
+    await db.commit()
+
+    # a released hold goes to the next client in line
+    if was_held:
+        BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+        offers = await waitlist.offer_freed(db, entry.hold_start_utc, entry.hold_end_utc + BUFFER)
+        await db.commit()
+        background_tasks.add_task(waitlist.notify_holds, offers)
+        publish_day_changed(entry.hold_start_utc.astimezone(ZoneInfo(settings.TIMEZONE)).date())
+
+# ---------- CLAIM HOLD ----------
+@router.post("/{entry_id}/claim", response_model=AppointmentOut, status_code=status.HTTP_201_CREATED)
+async def claim_hold(entry_id: int, payload: WaitlistClaim, db: AsyncSession = Depends(get_db)):
+    utc = ZoneInfo("UTC")
+
+    entry = (await db.execute(select(WaitlistEntry).where(WaitlistEntry.id == entry_id))).scalar_one_or_none()
+    if not entry or normalize_phone(entry.client_phone) != normalize_phone(payload.client_phone):
+        raise HTTPException(404, "Waitlist entry not found")
+    if entry.status != "held" or entry.hold_expires_utc <= datetime.now(utc):
+        raise HTTPException(410, "This hold is no longer available")
+
+    # the hold kept others out; still guard against an admin booking over it
+    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+    conflicts = (
+        await db.execute(
+            select(func.count(Appointment.id)).where(
+                Appointment.service_id == entry.service_id,
+                Appointment.status == "confirmed",
+                Appointment.start_utc < entry.hold_end_utc + BUFFER,
+                Appointment.end_utc   > entry.hold_start_utc,
+            )
+        )
+    ).scalar_one()
+    if conflicts:
+        raise HTTPException(409, "This time is already booked. Please pick another slot.")
+    # the day may have been closed or shortened since the hold was offered
+    window = await working_window(db, entry.hold_start_utc.astimezone(ZoneInfo(settings.TIMEZONE)).date())
+    if window is None or not (window[0] <= entry.hold_start_utc and entry.hold_end_utc <= window[1]):
+        raise HTTPException(410, "This hold is no longer available")
+
+    appt = Appointment(
+        service_id=entry.service_id,
+        client_name=entry.client_name,
+        client_phone=entry.client_phone,
+        client_phone_e164=normalize_phone(entry.client_phone),
+        start_utc=entry.hold_start_utc,
+        end_utc=entry.hold_end_utc,
+        status="confirmed",
+    )
+    db.add(appt)
+    entry.status = "booked"
+    await db.flush()
+    reminders.schedule(db, appt)
+    await db.commit()
+    publish_day_changed(entry.hold_start_utc.astimezone(ZoneInfo(settings.TIMEZONE)).date())
+    await db.refresh(appt)
+    return appt
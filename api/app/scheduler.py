@@ -2,53 +2,30 @@
 from __future__ import annotations
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy import select
-from datetime import datetime, date as _date, time as dtime, timedelta
+from datetime import datetime, date as _date, time as dtime
 from zoneinfo import ZoneInfo
 from typing import Optional, Dict
-import re
 
 from .db import AsyncSessionLocal
 from .models import Appointment, Service
+from .notifications import send_sms
+from .reminders import reminder_body, dispatch_due, backfill
+from .waitlist import expire_holds
+from .idempotency import purge_expired
+from .events import refresh_watched_days
 from .core.config import settings
 
 
-# ---------------------------
-# Twilio helpers
-# ---------------------------
-def _twilio_client():
-    """Return Twilio Client if fully configured & installed, else None."""
-    sid = getattr(settings, "TWILIO_ACCOUNT_SID", None)
-    token = getattr(settings, "TWILIO_AUTH_TOKEN", None)
-    from_ = getattr(settings, "TWILIO_FROM", None)
-    if not (sid and token and from_):
-        return None
-    try:
-        from twilio.rest import Client  # type: ignore
-    except Exception:
-        return None
-    return Client(sid, token)
-
-
-def _to_whatsapp(phone: str) -> str:
-    """Normalize IL numbers to E.164 and prefix 'whatsapp:'."""
-    p = re.sub(r"\D", "", phone)
-    if p.startswith("0") and len(p) == 10:
-        # 05XXXXXXXX -> +9725XXXXXXXX
-        p = "+972" + p[1:]
-    elif p.startswith("972"):
-        p = "+" + p
-    elif not p.startswith("+"):
-        raise ValueError("Invalid IL phone format")
-    return f"whatsapp:{p}"
-
-
 # ---------------------------
 # Reminder sending
 # ---------------------------
 async def send_evening_reminders(for_local_date: _date):
-    """Send reminders for all confirmed appointments on `for_local_date` (local tz)."""
+    """
+    Send reminders for all confirmed appointments on `for_local_date` (local tz) in one go.
+    Manual/dev use only; scheduled reminders go through the queue in reminders.py.
+    """
     tz = ZoneInfo(settings.TIMEZONE)
     utc = ZoneInfo("UTC")
 
@@ -73,7 +50,6 @@ async def send_evening_reminders(for_local_date: _date):
             res2 = await db.execute(select(Service).where(Service.id.in_(svc_ids)))
             svc_by_id = {s.id: s for s in res2.scalars().all()}
 
-    client = _twilio_client()
     sent = 0
     errors = 0
 
@@ -81,70 +57,72 @@ async def send_evening_reminders(for_local_date: _date):
         local_dt = ap.start_utc.astimezone(tz)
         svc = svc_by_id.get(ap.service_id)
         svc_name = svc.name if svc else "שירות / Service"
-        when_he = local_dt.strftime("%d/%m/%Y בשעה %H:%M")
-        when_en = local_dt.strftime("%d/%m/%Y at %H:%M")
-
-        body = (
-            f"‏תזכורת ✨ Shirel Beauty\n"
-            f"{svc_name} — {when_he}\n"
-            f"מדיניות ביטול: פחות מ־24 שעות → תשלום 50%.\n\n"
-            f"Reminder ✨ Shirel Beauty\n"
-            f"{svc_name} — {when_en}\n"
-            f"Cancellation policy: <24h → 50% fee."
-        )
+        body = reminder_body(svc_name, local_dt)
 
-        try:
-            to = _to_whatsapp(ap.client_phone)
-            if client:
-                client.messages.create(
-                    from_=settings.TWILIO_FROM,
-                    to=to,
-                    body=body,
-                )
-                print(f"[REMINDER] ✅ WhatsApp sent to {ap.client_phone} (appt #{ap.id})")
-            else:
-                print(f"[REMINDER][DRY-RUN] -> {ap.client_phone}: {body}")
+        if await send_sms(ap.client_phone, body):
+            print(f"[REMINDER] ✅ Sent to {ap.client_phone} (appt #{ap.id})")
             sent += 1
-        except Exception as e:
-            print(f"[REMINDER] ❌ Failed for appt #{ap.id} ({ap.client_phone}): {e}")
+        else:
+            print(f"[REMINDER] ❌ Failed for appt #{ap.id} ({ap.client_phone})")
             errors += 1
 
     # Optional: summary to owner
     owner = getattr(settings, "OWNER_WHATSAPP", None)
-    if owner and (client or True):
+    if owner:
         summary = (
             f"Shirel Beauty — reminder summary for {for_local_date.isoformat()}:\n"
             f"Total appts: {len(appts)}, sent: {sent}, errors: {errors}."
         )
-        try:
-            if client:
-                client.messages.create(from_=settings.TWILIO_FROM, to=owner, body=summary)
+        if await send_sms(owner, summary):
             print(f"[REMINDER] Summary sent to owner: {summary}")
-        except Exception as e:
-            print(f"[REMINDER] Owner summary failed: {e}")
-
-
-async def _run_for_tomorrow():
-    tz = ZoneInfo(settings.TIMEZONE)
-    target = (datetime.now(tz) + timedelta(days=1)).date()
-    await send_evening_reminders(target)
+        else:
+            print("[REMINDER] Owner summary failed")
 
 
 _scheduler: Optional[AsyncIOScheduler] = None
 
 
 def start_scheduler():
-    """Start APScheduler with a daily job at REMINDER_HOUR local time."""
+    """
+    Start APScheduler: housekeeping jobs always, plus the reminder queue
+    dispatcher when ENABLE_REMINDERS is on.
+    """
     global _scheduler
     if _scheduler:
         return
 
     tz = ZoneInfo(settings.TIMEZONE)
     _scheduler = AsyncIOScheduler(timezone=tz)
-    trig = CronTrigger(hour=settings.REMINDER_HOUR, minute=0, timezone=tz)
-    _scheduler.add_job(_run_for_tomorrow, trigger=trig, id="evening_reminders", replace_existing=True)
-    _scheduler.start()
-    print(
-        f"[SCHED] Evening reminders scheduled daily at {settings.REMINDER_HOUR:02d}:00 "
-        f"{settings.TIMEZONE} (runs for tomorrow’s appointments)."
+    # lapsed waitlist holds go to the next client in line
+    _scheduler.add_job(expire_holds, trigger=IntervalTrigger(minutes=1), id="waitlist_holds", replace_existing=True)
+    # live availability views; no-op while nobody is watching
+    _scheduler.add_job(
+        refresh_watched_days,
+        trigger=IntervalTrigger(seconds=settings.AVAILABILITY_REFRESH_SECONDS),
+        id="availability_refresh",
+        replace_existing=True,
+        coalesce=True,
     )
+    # stored idempotent responses past their TTL
+    _scheduler.add_job(
+        purge_expired, trigger=IntervalTrigger(hours=1), id="idempotency_purge", replace_existing=True, coalesce=True
+    )
+
+    if settings.ENABLE_REMINDERS:
+        # each tick pulls only the reminders that are due, spreading sends over the day
+        _scheduler.add_job(
+            dispatch_due,
+            trigger=IntervalTrigger(seconds=settings.REMINDER_TICK_SECONDS),
+            id="reminder_dispatch",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+        # queue reminders for appointments booked before the queue existed (runs once, now)
+        _scheduler.add_job(backfill, id="reminder_backfill", replace_existing=True)
+    _scheduler.start()
+    if settings.ENABLE_REMINDERS:
+        print(
+            f"[SCHED] Reminder queue dispatching every {settings.REMINDER_TICK_SECONDS}s "
+            f"(offsets: {', '.join(str(m) for m in settings.REMINDER_OFFSETS_MINUTES)} min before)."
+        )
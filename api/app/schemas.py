@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from typing import Optional, Literal, List
-from datetime import datetime
+from datetime import datetime, date
 from pydantic import BaseModel, Field, field_validator
 
 # --- Regex rules ---
@@ -57,6 +57,15 @@ class AppointmentOut(BaseModel):
     class Config:
         from_attributes = True
 
+# -------- Client lookup ("my appointments") --------
+class ClientAppointmentOut(AppointmentOut):
+    service_name: Optional[str] = None
+
+class ClientAppointmentsOut(BaseModel):
+    phone: str  # normalized E.164 the lookup used
+    upcoming: List[ClientAppointmentOut]  # soonest first
+    past: List[ClientAppointmentOut]      # most recent first
+
 # -------- Admin actions (cancel/reschedule) --------
 class AppointmentActionResponse(BaseModel):
     appointment: AppointmentOut
@@ -66,6 +75,23 @@ class AppointmentUpdate(BaseModel):
     action: Literal["cancel", "reschedule"]
     new_start_iso: Optional[str] = None  # required when action="reschedule"
 
+# -------- Admin day view --------
+class AdminAppointmentOut(AppointmentOut):
+    service_name: Optional[str] = None
+    service_price: int = 0                # shekels
+    penalty_if_cancelled_now: int = 0     # shekels, per the 24h policy
+
+class AdminDayTotals(BaseModel):
+    confirmed: int
+    cancelled: int
+    revenue: int               # sum of confirmed prices
+    penalties_if_cancelled: int
+
+class AdminDayOut(BaseModel):
+    date: str  # YYYY-MM-DD (local)
+    appointments: List[AdminAppointmentOut]
+    totals: AdminDayTotals
+
 # -------- Override Button --------
 class OverrideOut(BaseModel):
     date: str          # YYYY-MM-DD
@@ -77,4 +103,51 @@ class OverrideUpsert(BaseModel):
     start_time: Optional[str] = None  # when not closed; omit to keep default 08:00
     end_time:   Optional[str] = None  # when not closed; omit to keep default 22:00
     is_closed: bool = False
+    waitlist_days: int = Field(0, ge=0)  # when closing: as CloseDaysRequest.waitlist_days
+
+class CloseDaysRequest(BaseModel):
+    date_from: str               # YYYY-MM-DD (local)
+    date_to: Optional[str] = None  # inclusive; defaults to date_from
+    waitlist_days: int = Field(0, ge=0)  # >0: put cancelled clients on the waitlist for the days after
+
+class CloseDaysOut(BaseModel):
+    days: List[str]              # YYYY-MM-DD, now closed
+    cancelled: List[AppointmentOut]
+    waitlisted: int
+
 
+# -------- Waitlist --------
+class WaitlistCreate(BaseModel):
+    service_id: int
+    date_from: str  # YYYY-MM-DD (local)
+    date_to: str    # YYYY-MM-DD (local), inclusive
+    client_name: str = Field(pattern=NAME_REGEX, min_length=4, max_length=100)
+    client_phone: str = Field(pattern=PHONE_REGEX)
+
+    @field_validator("client_name", "client_phone", mode="before")
+    @classmethod
+    def _strip_ws(cls, v):
+        return v.strip() if isinstance(v, str) else v
+
+class WaitlistOut(BaseModel):
+    id: int
+    service_id: int
+    client_name: str
+    client_phone: str
+    date_from: date
+    date_to: date
+    status: Literal["waiting", "held", "booked", "expired", "cancelled"]
+    hold_start_utc: Optional[datetime] = None
+    hold_end_utc: Optional[datetime] = None
+    hold_expires_utc: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class WaitlistClaim(BaseModel):
+    client_phone: str = Field(pattern=PHONE_REGEX)  # must match the waitlist entry
+
+    @field_validator("client_phone", mode="before")
+    @classmethod
+    def _strip_ws(cls, v):
+        return v.strip() if isinstance(v, str) else v
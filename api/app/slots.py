@@ -0,0 +1,151 @@
+# api/app/slots.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, date as _date, time as dtime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Appointment, DayOverride, WaitlistEntry
+from .schemas import AvailabilitySlot
+from .core.config import settings
+
+# 30-minute slot steps
+SLOT_STEP_MIN = 30
+
+# Default working hours when a day has no DayOverride
+DEFAULT_OPEN = dtime(8, 0)
+DEFAULT_CLOSE = dtime(22, 0)
+
+
+@dataclass
+class DayState:
+    """Everything needed to compute slots for one local day, loaded once."""
+    day: _date
+    window: Optional[tuple[datetime, datetime]]  # local (open, close); None when closed
+    # UTC [start, end + buffer) of confirmed appointments and active waitlist holds
+    blocked: list[tuple[datetime, datetime]] = field(default_factory=list)
+
+
+async def working_window(db: AsyncSession, d: _date) -> Optional[tuple[datetime, datetime]]:
+    """Local (open, close) for `d`: default 08:00–22:00 unless a DayOverride says otherwise."""
+    tz = ZoneInfo(settings.TIMEZONE)
+    open_start, open_end = DEFAULT_OPEN, DEFAULT_CLOSE
+
+    ov = (await db.execute(select(DayOverride).where(DayOverride.date == d))).scalar_one_or_none()
+    if ov:
+        if ov.is_closed:
+            return None
+        if ov.start_time:
+            open_start = ov.start_time
+        if ov.end_time:
+            open_end = ov.end_time
+
+    # an override that produced an invalid window means no slots
+    if open_end <= open_start:
+        return None
+    return datetime.combine(d, open_start, tzinfo=tz), datetime.combine(d, open_end, tzinfo=tz)
+
+
+async def load_day(db: AsyncSession, d: _date) -> DayState:
+    utc = ZoneInfo("UTC")
+    window = await working_window(db, d)
+    if window is None:
+        return DayState(day=d, window=None)
+
+    day_start_utc = window[0].astimezone(utc)
+    day_end_utc = window[1].astimezone(utc)
+    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+
+    existing = (
+        await db.execute(
+            select(Appointment.start_utc, Appointment.end_utc)
+            .where(
+                Appointment.status == "confirmed",
+                Appointment.start_utc < day_end_utc,
+                Appointment.end_utc > day_start_utc,
+            )
+            .order_by(Appointment.start_utc)
+        )
+    ).all()
+    holds = (
+        await db.execute(
+            select(WaitlistEntry.hold_start_utc, WaitlistEntry.hold_end_utc).where(
+                WaitlistEntry.status == "held",
+                WaitlistEntry.hold_expires_utc > datetime.now(utc),
+                WaitlistEntry.hold_start_utc < day_end_utc,
+                WaitlistEntry.hold_end_utc > day_start_utc,
+            )
+        )
+    ).all()
+
+    # buffer AFTER existing appts (and holds, which stand in for an appointment)
+    blocked = sorted((s, e + BUFFER) for s, e in [*existing, *holds])
+    return DayState(day=d, window=window, blocked=blocked)
+
+
+def slots_for(state: DayState, duration_min: int) -> list[AvailabilitySlot]:
+    """Candidate slots of `duration_min` on the SLOT_STEP_MIN grid that honor lead time and blocked ranges."""
+    if state.window is None:
+        return []
+    utc = ZoneInfo("UTC")
+    tz = ZoneInfo(settings.TIMEZONE)
+    day_start, day_end = state.window
+
+    # Lead time (e.g., 30 min) in local tz
+    lead_cutoff = datetime.now(tz) + timedelta(minutes=settings.LEAD_MINUTES)
+    step = timedelta(minutes=SLOT_STEP_MIN)
+    duration = timedelta(minutes=duration_min)
+
+    slots: list[AvailabilitySlot] = []
+    cursor = day_start
+    while cursor + duration <= day_end:
+        start_local = cursor
+        end_local = cursor + duration
+
+        # Honor lead time
+        if start_local >= lead_cutoff:
+            s_u = start_local.astimezone(utc)
+            e_u = end_local.astimezone(utc)
+
+            # conflict if windows overlap
+            conflict = any(not (e_u <= b_start or s_u >= b_end) for b_start, b_end in state.blocked)
+            if not conflict:
+                slots.append(
+                    AvailabilitySlot(
+                        start_iso=start_local.isoformat(),
+                        end_iso=end_local.isoformat(),
+                        label=start_local.strftime("%H:%M"),
+                    )
+                )
+
+        cursor += step
+
+    return slots
+
+
+def free_intervals(state: DayState) -> list[tuple[datetime, datetime]]:
+    """UTC intervals inside working hours where a new appointment could start and end."""
+    if state.window is None:
+        return []
+    utc = ZoneInfo("UTC")
+    cursor = state.window[0].astimezone(utc)
+    close = state.window[1].astimezone(utc)
+
+    free: list[tuple[datetime, datetime]] = []
+    for b_start, b_end in state.blocked:
+        if b_start > cursor:
+            free.append((cursor, min(b_start, close)))
+        cursor = max(cursor, b_end)
+        if cursor >= close:
+            break
+    if cursor < close:
+        free.append((cursor, close))
+    return [(s, e) for s, e in free if e > s]
+
+
+async def compute_slots(db: AsyncSession, duration_min: int, d: _date) -> list[AvailabilitySlot]:
+    return slots_for(await load_day(db, d), duration_min)
@@ -0,0 +1,145 @@
+# api/app/transport.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from .core.config import settings
+
+log = logging.getLogger(__name__)
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Normalize a client phone to E.164 (+9725XXXXXXXX). Accepts IL local numbers
+    (05XXXXXXXX), 972..., +..., and an optional 'whatsapp:' prefix.
+    Raises ValueError for anything else.
+    """
+    p = phone.strip()
+    if p.startswith("whatsapp:"):
+        p = p[len("whatsapp:"):]
+    plus = p.startswith("+")
+    digits = re.sub(r"\D", "", p)
+    if plus and digits:
+        return "+" + digits
+    if digits.startswith("0") and len(digits) == 10:
+        # 05XXXXXXXX -> +9725XXXXXXXX
+        return "+972" + digits[1:]
+    if digits.startswith("972"):
+        return "+" + digits
+    raise ValueError(f"Invalid IL phone format: {phone!r}")
+
+
+class Transport(ABC):
+    """Delivers one message to an E.164 number. Returns True when accepted for delivery."""
+
+    name: str = "base"
+
+    @property
+    def configured(self) -> bool:
+        """False when sends can't go anywhere (e.g. Twilio without credentials): a dry run."""
+        return True
+
+    @abstractmethod
+    async def send(self, to: str, body: str) -> bool: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class TwilioTransport(Transport):
+    """SMS, or WhatsApp when TWILIO_FROM starts with 'whatsapp:'."""
+
+    name = "twilio"
+
+    def __init__(self, account_sid: Optional[str], auth_token: Optional[str], from_: Optional[str]):
+        self.from_ = from_
+        self.whatsapp = bool(from_ and from_.startswith("whatsapp:"))
+        self._client = None
+        if account_sid and auth_token and from_:
+            try:
+                from twilio.rest import Client  # type: ignore
+            except Exception:
+                log.warning("twilio package not installed; messages will be skipped")
+            else:
+                self._client = Client(account_sid, auth_token)
+        self._warned = False
+
+    @property
+    def configured(self) -> bool:
+        return self._client is not None
+
+    async def send(self, to: str, body: str) -> bool:
+        if self._client is None:
+            if not self._warned:
+                log.warning("Twilio not configured; messages are not being sent")
+                self._warned = True
+            log.debug("Twilio not configured; skipping send to %s. Body=%s", to, body)
+            return False
+        to = f"whatsapp:{to}" if self.whatsapp else to
+        # the Twilio client is blocking; keep the event loop free while it waits on HTTP
+        msg = await asyncio.to_thread(self._client.messages.create, from_=self.from_, to=to, body=body)
+        log.info("Twilio queued message %s to %s", msg.sid, to)
+        return True
+
+
+class MemoryTransport(Transport):
+    """Keeps messages in a list. For local runs and the throughput harness."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send(self, to: str, body: str) -> bool:
+        self.sent.append({"to": to, "body": body})
+        return True
+
+
+class FileTransport(Transport):
+    """Appends one JSON object per message to an NDJSON file."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, "a", encoding="utf-8")
+
+    async def send(self, to: str, body: str) -> bool:
+        line = json.dumps(
+            {"ts": datetime.now(ZoneInfo("UTC")).isoformat(), "to": to, "body": body},
+            ensure_ascii=False,
+        )
+        self._fh.write(line + "\n")
+        self._fh.flush()
+        return True
+
+    async def close(self) -> None:
+        self._fh.close()
+
+
+def make_transport(kind: str) -> Transport:
+    if kind == "twilio":
+        return TwilioTransport(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, settings.TWILIO_FROM)
+    if kind == "memory":
+        return MemoryTransport()
+    if kind == "file":
+        return FileTransport(settings.NOTIFY_FILE_PATH)
+    raise ValueError(f"Unknown NOTIFY_TRANSPORT: {kind!r}")
+
+
+_transport: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    """The transport selected by NOTIFY_TRANSPORT (created on first use)."""
+    global _transport
+    if _transport is None:
+        _transport = make_transport(settings.NOTIFY_TRANSPORT)
+    return _transport
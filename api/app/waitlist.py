@@ -0,0 +1,268 @@
+# api/app/waitlist.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, date as _date, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .db import AsyncSessionLocal, fresh_read_session
+from .events import publish_day_changed
+from .models import Service, WaitlistEntry
+from .notifications import send_sms
+from .slots import DayState, load_day, slots_for, free_intervals, working_window
+from .core.config import settings
+
+# waiting entries considered per freed interval (oldest first)
+MATCH_CANDIDATES = 50
+# days a new sign-up is checked against already-free time; later days are matched as time frees up
+JOIN_SCAN_DAYS = 14
+# namespace of the per-day Postgres advisory locks taken while matching
+_MATCH_LOCK_NS = 0x5742
+
+
+@dataclass
+class HoldOffer:
+    """Plain data for the hold notification, safe to use after the session is closed."""
+    entry_id: int
+    client_phone: str
+    service_name: str
+    start_utc: datetime
+    expires_utc: datetime
+
+
+def _gaps_touching(state: DayState, start_utc: datetime, end_utc: datetime) -> list[tuple[datetime, datetime]]:
+    return [(s, e) for s, e in free_intervals(state) if s < end_utc and e > start_utc]
+
+
+def _first_slot_in(state: DayState, duration_min: int, gaps) -> Optional[tuple[datetime, datetime]]:
+    utc = ZoneInfo("UTC")
+    for slot in slots_for(state, duration_min):
+        s = datetime.fromisoformat(slot.start_iso).astimezone(utc)
+        e = datetime.fromisoformat(slot.end_iso).astimezone(utc)
+        if any(gs <= s and e <= ge for gs, ge in gaps):
+            return s, e
+    return None
+
+
+async def _lock_day(db: AsyncSession, d: _date) -> None:
+    """
+    Serialize matching per local day until the transaction ends, so two concurrent matches
+    can't both see the same gap as free and place overlapping holds. On SQLite matching
+    runs in writer sessions, which BEGIN IMMEDIATE already serializes.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:ns, :day)"), {"ns": _MATCH_LOCK_NS, "day": d.toordinal()})
+
+
+async def match_freed_interval(
+    db: AsyncSession, d: _date, start_utc: datetime, end_utc: datetime
+) -> list[HoldOffer]:
+    """
+    Offer time freed on local day `d` (UTC [start_utc, end_utc)) to the waitlist.
+    Waiting entries for that day whose duration fits the free gap are tried oldest
+    first; each match is put on hold for WAITLIST_HOLD_MINUTES. Caller commits.
+    """
+    utc = ZoneInfo("UTC")
+    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+
+    await _lock_day(db, d)
+    state = await load_day(db, d)
+    gaps = _gaps_touching(state, start_utc, end_utc)
+    if not gaps:
+        return []
+    longest = max(int((e - s).total_seconds() // 60) for s, e in gaps)
+
+    candidates = (
+        await db.execute(
+            select(WaitlistEntry, Service.name)
+            .join(Service, Service.id == WaitlistEntry.service_id)
+            .where(
+                WaitlistEntry.status == "waiting",
+                WaitlistEntry.date_from <= d,
+                WaitlistEntry.date_to >= d,
+                WaitlistEntry.duration_min <= longest,
+                Service.active == True,
+            )
+            .order_by(WaitlistEntry.created_at, WaitlistEntry.id)
+            .limit(MATCH_CANDIDATES)
+        )
+    ).all()
+
+    now = datetime.now(utc)
+    offers: list[HoldOffer] = []
+    for entry, service_name in candidates:
+        slot = _first_slot_in(state, entry.duration_min, gaps)
+        if slot is None:
+            continue
+        s, e = slot
+        entry.status = "held"
+        entry.hold_start_utc = s
+        entry.hold_end_utc = e
+        entry.hold_expires_utc = now + timedelta(minutes=settings.WAITLIST_HOLD_MINUTES)
+        offers.append(
+            HoldOffer(entry.id, entry.client_phone, service_name, s, entry.hold_expires_utc)
+        )
+
+        # the hold blocks like an appointment for the remaining candidates
+        state.blocked = sorted([*state.blocked, (s, e + BUFFER)])
+        gaps = _gaps_touching(state, start_utc, end_utc)
+        if not gaps:
+            break
+
+    return offers
+
+
+async def offer_freed(db: AsyncSession, start_utc: datetime, end_utc: datetime) -> list[HoldOffer]:
+    """match_freed_interval for an appointment-sized interval (local day taken from its start)."""
+    d = start_utc.astimezone(ZoneInfo(settings.TIMEZONE)).date()
+    return await match_freed_interval(db, d, start_utc, end_utc)
+
+
+async def offer_widened_hours(
+    db: AsyncSession,
+    d: _date,
+    old_window: Optional[tuple[datetime, datetime]],
+    new_window: Optional[tuple[datetime, datetime]],
+) -> list[HoldOffer]:
+    """Offer the hours an override added to `d` (local windows as returned by slots.working_window)."""
+    if new_window is None:
+        return []
+    utc = ZoneInfo("UTC")
+    new_start, new_end = new_window
+    if old_window is None:
+        added = [(new_start, new_end)]
+    else:
+        old_start, old_end = old_window
+        added = []
+        if new_start < old_start:
+            added.append((new_start, min(new_end, old_start)))
+        if new_end > old_end:
+            added.append((max(new_start, old_end), new_end))
+
+    offers: list[HoldOffer] = []
+    for s, e in added:
+        if e > s:
+            offers += await match_freed_interval(db, d, s.astimezone(utc), e.astimezone(utc))
+    return offers
+
+
+async def offer_open_days(
+    db: AsyncSession, d_from: _date, d_to: _date, until_held: Optional[int] = None
+) -> list[HoldOffer]:
+    """
+    Offer time that is already free on local days [d_from, d_to] (e.g. right after new
+    entries were added, which nothing else would match until some time is freed).
+    With `until_held`, stop after the day on which that entry got a hold. Caller commits.
+    """
+    utc = ZoneInfo("UTC")
+    offers: list[HoldOffer] = []
+    d = d_from
+    while d <= d_to:
+        window = await working_window(db, d)
+        if window is not None:
+            offers += await match_freed_interval(db, d, window[0].astimezone(utc), window[1].astimezone(utc))
+            if until_held is not None and any(o.entry_id == until_held for o in offers):
+                break
+        d += timedelta(days=1)
+    return offers
+
+
+async def match_new_entry(entry_id: int) -> None:
+    """Background task after a sign-up: offer already-free time in the entry's first JOIN_SCAN_DAYS days."""
+    tz = ZoneInfo(settings.TIMEZONE)
+    async with AsyncSessionLocal() as db:
+        entry = await db.get(WaitlistEntry, entry_id)
+        if entry is None or entry.status != "waiting":
+            return
+        d_to = min(entry.date_to, entry.date_from + timedelta(days=JOIN_SCAN_DAYS - 1))
+        offers = await offer_open_days(db, entry.date_from, d_to, until_held=entry.id)
+        await db.commit()
+
+    publish_day_changed(*{o.start_utc.astimezone(tz).date() for o in offers})
+    await notify_holds(offers)
+
+
+async def overlaps_hold(db: AsyncSession, start_utc: datetime, end_utc: datetime) -> bool:
+    """True if [start_utc, end_utc) collides with an active waitlist hold (same rule as the booking conflict check)."""
+    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+    count = (
+        await db.execute(
+            select(func.count(WaitlistEntry.id)).where(
+                WaitlistEntry.status == "held",
+                WaitlistEntry.hold_expires_utc > datetime.now(ZoneInfo("UTC")),
+                WaitlistEntry.hold_start_utc < end_utc + BUFFER,
+                WaitlistEntry.hold_end_utc > start_utc,
+            )
+        )
+    ).scalar_one()
+    return count > 0
+
+
+def _hold_message(o: HoldOffer) -> str:
+    tz = ZoneInfo(settings.TIMEZONE)
+    local_dt = o.start_utc.astimezone(tz)
+    until = o.expires_utc.astimezone(tz).strftime("%H:%M")
+    return (
+        f"‏התפנה תור ✨ Shirel Beauty\n"
+        f"{o.service_name} — {local_dt.strftime('%d/%m/%Y בשעה %H:%M')}\n"
+        f"התור שמור עבורך עד {until}.\n\n"
+        f"A slot opened up ✨ Shirel Beauty\n"
+        f"{o.service_name} — {local_dt.strftime('%d/%m/%Y at %H:%M')}\n"
+        f"Held for you until {until} (waitlist #{o.entry_id})."
+    )
+
+
+async def notify_holds(offers: list[HoldOffer]) -> None:
+    for o in offers:
+        await send_sms(o.client_phone, _hold_message(o))
+
+
+async def expire_holds() -> None:
+    """Release lapsed holds and offer their slots to the next clients in line."""
+    utc = ZoneInfo("UTC")
+    BUFFER = timedelta(minutes=settings.BUFFER_MINUTES)
+
+    # most minutes nothing lapses; check without taking the writer's lock
+    async with fresh_read_session() as rdb:
+        any_lapsed = (
+            await rdb.execute(
+                select(WaitlistEntry.id)
+                .where(WaitlistEntry.status == "held", WaitlistEntry.hold_expires_utc <= datetime.now(utc))
+                .limit(1)
+            )
+        ).first()
+    if not any_lapsed:
+        return
+
+    async with AsyncSessionLocal() as db:
+        lapsed = (
+            await db.execute(
+                select(WaitlistEntry).where(
+                    WaitlistEntry.status == "held",
+                    WaitlistEntry.hold_expires_utc <= datetime.now(utc),
+                )
+            )
+        ).scalars().all()
+        if not lapsed:
+            return
+        # days are matched (and locked) in date order
+        lapsed = sorted(lapsed, key=lambda e: e.hold_start_utc)
+        for entry in lapsed:
+            entry.status = "expired"
+        await db.flush()
+
+        offers: list[HoldOffer] = []
+        for entry in lapsed:
+            offers += await offer_freed(db, entry.hold_start_utc, entry.hold_end_utc + BUFFER)
+        await db.commit()
+
+    tz = ZoneInfo(settings.TIMEZONE)
+    publish_day_changed(
+        *{e.hold_start_utc.astimezone(tz).date() for e in lapsed},
+        *{o.start_utc.astimezone(tz).date() for o in offers},
+    )
+    await notify_holds(offers)
@@ -1,7 +1,7 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import { View, Text, Pressable, FlatList, Alert } from "react-native";
 import { useRouter } from "expo-router";
-import { listAppointments, cancelAppointment, fetchServices, Service } from "../lib/api";
+import { cancelAppointment, fetchAdminDay, AdminDay } from "../lib/api";
 import { logout } from "../lib/auth";
 
 function formatLocal(isoUtc: string) {
@@ -11,19 +11,14 @@ function formatLocal(isoUtc: string) {
 
 export default function AdminScreen() {
   const [dateISO, setDateISO] = useState(() => new Date().toISOString().slice(0, 10));
-  const [items, setItems] = useState<any[]>([]);
-  const [services, setServices] = useState<Service[]>([]);
+  const [day, setDay] = useState<AdminDay | null>(null);
   const [loading, setLoading] = useState(false);
   const router = useRouter();
 
-  useEffect(() => {
-    fetchServices().then(setServices).catch(() => {});
-  }, []);
-
   async function load() {
     setLoading(true);
     try {
-      setItems(await listAppointments(dateISO));
+      setDay(await fetchAdminDay(dateISO));
     } finally {
       setLoading(false);
     }
@@ -32,8 +27,6 @@ export default function AdminScreen() {
     load();
   }, [dateISO]);
 
-  const svcById = useMemo(() => Object.fromEntries(services.map((s) => [s.id, s])), [services]);
-
   async function onCancel(id: number) {
     try {
       const res = await cancelAppointment(id);
@@ -103,21 +96,30 @@ export default function AdminScreen() {
         </Pressable>
       </View>
 
+      {day && (
+        <Text style={{ color: "#374151" }}>
+          {day.totals.confirmed} confirmed · {day.totals.cancelled} cancelled · ₪{day.totals.revenue} expected
+        </Text>
+      )}
+
       <FlatList
         refreshing={loading}
         onRefresh={load}
-        data={items}
+        data={day?.appointments ?? []}
         keyExtractor={(x) => String(x.id)}
         ItemSeparatorComponent={() => <View style={{ height: 8 }} />}
         renderItem={({ item }) => (
           <View style={{ padding: 12, borderRadius: 12, borderWidth: 1, borderColor: "#ddd" }}>
             <Text style={{ fontWeight: "700" }}>
-              {formatLocal(item.start_utc)} — {formatLocal(item.end_utc)} · {svcById[item.service_id]?.name || "Service"}
+              {formatLocal(item.start_utc)} — {formatLocal(item.end_utc)} · {item.service_name || "Service"} · ₪{item.service_price}
             </Text>
             <Text>
               {item.client_name} · {item.client_phone}
             </Text>
             <Text>Status: {item.status}</Text>
+            {item.status === "confirmed" && item.penalty_if_cancelled_now > 0 && (
+              <Text style={{ color: "#b45309" }}>Cancel now → fee ₪{item.penalty_if_cancelled_now}</Text>
+            )}
 
             {item.status === "confirmed" && (
               <View style={{ flexDirection: "row", gap: 8, marginTop: 8 }}>
@@ -1,7 +1,7 @@
 import { useLocalSearchParams, useRouter } from "expo-router";
 import { useEffect, useState } from "react";
 import { View, Text, TextInput, Pressable, Alert, KeyboardAvoidingView, Platform } from "react-native";
-import { bookAppointment, fetchServices, rescheduleAppointment, Service } from "../lib/api";
+import { bookAppointment, fetchServices, newIdempotencyKey, rescheduleAppointment, Service } from "../lib/api";
 
 // ---------- helpers for IL phone (after +972) ----------
 const onlyDigits = (s: string) => s.replace(/\D/g, "");
@@ -23,6 +23,8 @@ export default function ConfirmScreen() {
   const [svc, setSvc] = useState<Service | null>(null);
   const [name, setName] = useState("");
   const [phoneDigits, setPhoneDigits] = useState(""); // 9 digits after +972 only
+  // stable for this screen, so a retried submit replays instead of double-booking
+  const [idempotencyKey] = useState(newIdempotencyKey);
 
   const isReschedule = !!apptId;
 
@@ -45,7 +47,7 @@ export default function ConfirmScreen() {
     if (!svc || !start_iso) return;
     try {
       if (isReschedule) {
-        await rescheduleAppointment(Number(apptId), String(start_iso));
+        await rescheduleAppointment(Number(apptId), String(start_iso), idempotencyKey);
         Alert.alert("עודכן!", "התור הועבר בהצלחה", [{ text: "סגור", onPress: () => router.replace("/admin") }]);
       } else {
         if (!isNameValid || !isPhoneValid) {
@@ -60,7 +62,7 @@ export default function ConfirmScreen() {
           start_iso: String(start_iso),
           client_name: trimmedName,
           client_phone: phoneForApi, // whatsapp:+972XXXXXXXXX
-        });
+        }, idempotencyKey);
         Alert.alert("נקבע!", "התור נשמר בהצלחה", [{ text: "סגור", onPress: () => router.replace("/") }]);
       }
     } catch (e: any) {
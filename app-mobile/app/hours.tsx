@@ -2,11 +2,15 @@
 import { useLocalSearchParams, useRouter } from "expo-router";
 import { useEffect, useMemo, useState } from "react";
 import { View, Text, TextInput, Pressable, Alert, Switch, ActivityIndicator } from "react-native";
-import { listOverrides, upsertOverride, deleteOverride, OverrideOut } from "../lib/api";
+import { listOverrides, upsertOverride, deleteOverride, closeDays, OverrideOut } from "../lib/api";
 
 function pad(n: number) { return String(n).padStart(2, "0"); }
 function ym(dateISO: string) { return dateISO.slice(0, 7); }
 
+// When a day is closed its clients are cancelled and put on the waitlist for this many
+// following days (editable on screen; 0 = cancel only). The API caps it at WAITLIST_MAX_DAYS.
+const DEFAULT_WAITLIST_DAYS = 7;
+
 export default function HoursScreen() {
   const { date } = useLocalSearchParams<{ date?: string }>();
   const router = useRouter();
@@ -22,6 +26,7 @@ export default function HoursScreen() {
   const [startTime, setStartTime] = useState("08:00");
   const [endTime, setEndTime] = useState("22:00");
   const [hasExisting, setHasExisting] = useState(false);
+  const [waitlistDays, setWaitlistDays] = useState(String(DEFAULT_WAITLIST_DAYS));
 
   async function load() {
     setLoading(true);
@@ -64,7 +69,35 @@ export default function HoursScreen() {
     return /^\d{2}:\d{2}$/.test(s) && Number(s.slice(0,2)) < 24 && Number(s.slice(3,5)) < 60;
   }
 
+  async function onCloseDay(days: number) {
+    setSaving(true);
+    try {
+      const res = await closeDays(dateISO, dateISO, days);
+      Alert.alert("Closed", `Day closed; ${res.cancelled.length} appointment(s) cancelled and clients notified`);
+      await load();
+    } catch (e: any) {
+      Alert.alert("Error", e?.response?.data?.detail || "Failed to close day");
+    } finally {
+      setSaving(false);
+    }
+  }
+
   async function onSave() {
+    if (isClosed) {
+      if (!/^\d{1,2}$/.test(waitlistDays)) {
+        Alert.alert("Invalid number", "Waitlist days must be a whole number, e.g., 7 (0 = cancel only)");
+        return;
+      }
+      const days = Number(waitlistDays);
+      Alert.alert(
+        "Close day?",
+        days > 0
+          ? `Confirmed appointments on this day will be cancelled and the clients moved to the waitlist for the next ${days} day(s).`
+          : "Confirmed appointments on this day will be cancelled.",
+        [{ text: "Back", style: "cancel" }, { text: "Close day", style: "destructive", onPress: () => onCloseDay(days) }],
+      );
+      return;
+    }
     if (!isClosed) {
       if (!validHHMM(startTime) || !validHHMM(endTime)) {
         Alert.alert("Invalid time", "Please use HH:MM (24h), e.g., 14:00");
@@ -126,6 +159,19 @@ export default function HoursScreen() {
           <Switch value={isClosed} onValueChange={setIsClosed} />
         </View>
 
+        {isClosed && (
+          <View>
+            <Text style={{ marginBottom: 6 }}>Waitlist days for cancelled clients (0 = cancel only)</Text>
+            <TextInput
+              value={waitlistDays}
+              onChangeText={setWaitlistDays}
+              placeholder={String(DEFAULT_WAITLIST_DAYS)}
+              inputMode="numeric"
+              style={{ borderWidth: 1, borderColor: "#ddd", borderRadius: 10, padding: 12 }}
+            />
+          </View>
+        )}
+
         {!isClosed && (
           <View style={{ gap: 10 }}>
             <View>
@@ -2,7 +2,7 @@
 import { useEffect, useState } from "react";
 import { useLocalSearchParams, useRouter } from "expo-router";
 import { View, Text, FlatList, Pressable, ActivityIndicator } from "react-native";
-import { fetchAvailability, Slot } from "../lib/api";
+import { fetchAvailability, subscribeAvailability, Slot } from "../lib/api";
 
 export default function TimesScreen() {
   const { serviceId, date, apptId } = useLocalSearchParams<{
@@ -23,6 +23,9 @@ export default function TimesScreen() {
       .then(setSlots)
       .catch((e) => setErr(e.message))
       .finally(() => setLoading(false));
+
+    // keep the grid fresh while the screen is open (bookings, cancellations, hour changes)
+    return subscribeAvailability(Number(serviceId), String(date), setSlots);
   }, [serviceId, date]);
 
   if (loading) return <ActivityIndicator style={{ marginTop: 32 }} />;
@@ -20,6 +20,19 @@ console.log("API baseURL =", baseURL);
 
 export const api = axios.create({ baseURL, timeout: 10000 });
 
+// Read-your-writes: echo the time of our last write so the API reads it back from the
+// primary instead of a replica that may not have it yet
+let lastWrite: string | null = null;
+api.interceptors.response.use((res) => {
+  const stamp = res.headers?.["x-last-write"];
+  if (stamp) lastWrite = String(stamp);
+  return res;
+});
+api.interceptors.request.use((config) => {
+  if (lastWrite) config.headers.set("X-Last-Write", lastWrite);
+  return config;
+});
+
 export type Service = { id: number; name: string; duration_min: number; price: number; active: boolean };
 export type Slot = { start_iso: string; end_iso: string; label: string };
 
@@ -34,6 +47,7 @@ export type OverrideUpsert = {
   start_time?: string | null;
   end_time?: string | null;
   is_closed: boolean;
+  waitlist_days?: number; // when closing: days after it that cancelled clients wait for a slot
 };
 
 export async function listOverrides(month: string) {
@@ -51,6 +65,30 @@ export async function deleteOverride(date: string) {
   await api.delete(`/overrides/${date}`);
 }
 
+export type CloseDaysResult = {
+  days: string[];          // "YYYY-MM-DD"
+  cancelled: Array<{
+    id: number;
+    service_id: number;
+    client_name: string;
+    client_phone: string;
+    start_utc: string;
+    end_utc: string;
+    status: "confirmed" | "cancelled";
+  }>;
+  waitlisted: number;
+};
+
+// Close a day (or range) and cancel its upcoming appointments; clients are messaged by the server
+export async function closeDays(dateFrom: string, dateTo?: string, waitlistDays = 0) {
+  const { data } = await api.post<CloseDaysResult>("/overrides/close", {
+    date_from: dateFrom,
+    date_to: dateTo ?? null,
+    waitlist_days: waitlistDays,
+  });
+  return data;
+}
+
 export async function fetchServices() {
   const { data } = await api.get<Service[]>("/services");
   return data;
@@ -63,13 +101,51 @@ export async function fetchAvailability(serviceId: number, dateISO: string) {
   return data.slots;
 }
 
-export async function bookAppointment(params: {
-  service_id: number;
-  start_iso: string;
-  client_name: string;
-  client_phone: string;
-}) {
-  const { data } = await api.post("/appointments", params);
+// One key per user action; reuse it when retrying so the server replays the first result
+export function newIdempotencyKey() {
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
+const idempotencyHeaders = (key?: string) => (key ? { "Idempotency-Key": key } : undefined);
+
+type AvailabilityMessage =
+  | { type: "snapshot"; slots: Slot[] }
+  | { type: "diff"; added: Slot[]; removed: string[] }
+  | { type: "ping" };
+
+// Live slots for one service/day. Calls onSlots with the full, sorted list on every change.
+// Returns an unsubscribe function.
+export function subscribeAvailability(serviceId: number, dateISO: string, onSlots: (slots: Slot[]) => void) {
+  const wsURL = baseURL.replace(/^http/, "ws") + `/availability/ws?service_id=${serviceId}&date=${dateISO}`;
+  let current = new Map<string, Slot>();
+  const ws = new WebSocket(wsURL);
+
+  ws.onmessage = (ev) => {
+    const msg: AvailabilityMessage = JSON.parse(String(ev.data));
+    if (msg.type === "snapshot") {
+      current = new Map(msg.slots.map((s) => [s.start_iso, s]));
+    } else if (msg.type === "diff") {
+      msg.removed.forEach((k) => current.delete(k));
+      msg.added.forEach((s) => current.set(s.start_iso, s));
+    } else {
+      return;
+    }
+    onSlots([...current.values()].sort((a, b) => a.start_iso.localeCompare(b.start_iso)));
+  };
+
+  return () => ws.close();
+}
+
+export async function bookAppointment(
+  params: {
+    service_id: number;
+    start_iso: string;
+    client_name: string;
+    client_phone: string;
+  },
+  idempotencyKey?: string
+) {
+  const { data } = await api.post("/appointments", params, { headers: idempotencyHeaders(idempotencyKey) });
   return data;
 }
 
@@ -86,15 +162,98 @@ export async function listAppointments(dateISO: string) {
   }>;
 }
 
-export async function cancelAppointment(id: number) {
-  const { data } = await api.patch(`/appointments/${id}`, { action: "cancel" });
+export type ClientAppointment = {
+  id: number;
+  service_id: number;
+  client_name: string;
+  client_phone: string;
+  start_utc: string;
+  end_utc: string;
+  status: "confirmed" | "cancelled";
+  service_name: string | null;
+};
+
+// "My appointments": upcoming (soonest first) and recent past bookings for a phone number
+export async function fetchMyAppointments(phone: string, pastLimit = 20) {
+  const { data } = await api.get<{ phone: string; upcoming: ClientAppointment[]; past: ClientAppointment[] }>(
+    "/appointments/by-phone",
+    { params: { phone, past_limit: pastLimit } },
+  );
+  return data;
+}
+
+export type AdminAppointment = {
+  id: number;
+  service_id: number;
+  client_name: string;
+  client_phone: string;
+  start_utc: string;
+  end_utc: string;
+  status: "confirmed" | "cancelled";
+  service_name: string | null;
+  service_price: number;
+  penalty_if_cancelled_now: number;
+};
+
+export type AdminDay = {
+  date: string;
+  appointments: AdminAppointment[];
+  totals: { confirmed: number; cancelled: number; revenue: number; penalties_if_cancelled: number };
+};
+
+// Appointments of a day already joined with service name/price/penalty, plus totals
+export async function fetchAdminDay(dateISO: string) {
+  const { data } = await api.get<AdminDay>("/admin/day", { params: { date: dateISO } });
+  return data;
+}
+
+export async function cancelAppointment(id: number, idempotencyKey?: string) {
+  const { data } = await api.patch(
+    `/appointments/${id}`,
+    { action: "cancel" },
+    { headers: idempotencyHeaders(idempotencyKey) }
+  );
   return data as { appointment: any; penalty_due?: number };
 }
 
-export async function rescheduleAppointment(id: number, new_start_iso: string) {
-  const { data } = await api.patch(`/appointments/${id}`, {
-    action: "reschedule",
-    new_start_iso,
-  });
+export async function rescheduleAppointment(id: number, new_start_iso: string, idempotencyKey?: string) {
+  const { data } = await api.patch(
+    `/appointments/${id}`,
+    { action: "reschedule", new_start_iso },
+    { headers: idempotencyHeaders(idempotencyKey) }
+  );
   return data as { appointment: any };
 }
+
+export type WaitlistEntry = {
+  id: number;
+  service_id: number;
+  client_name: string;
+  client_phone: string;
+  date_from: string; // "YYYY-MM-DD"
+  date_to: string;
+  status: "waiting" | "held" | "booked" | "expired" | "cancelled";
+  hold_start_utc?: string | null;
+  hold_end_utc?: string | null;
+  hold_expires_utc?: string | null;
+};
+
+export async function joinWaitlist(params: {
+  service_id: number;
+  date_from: string;
+  date_to: string;
+  client_name: string;
+  client_phone: string;
+}) {
+  const { data } = await api.post<WaitlistEntry>("/waitlist", params);
+  return data;
+}
+
+export async function leaveWaitlist(id: number) {
+  await api.delete(`/waitlist/${id}`);
+}
+
+export async function claimWaitlistHold(id: number, client_phone: string) {
+  const { data } = await api.post(`/waitlist/${id}/claim`, { client_phone });
+  return data;
+}